@@ -6,79 +6,182 @@ Analyzes hourly electricity usage data and recommends the optimal rate plan.
 """
 
 import sys
+import math
 import argparse
 from data_loader import load_all_files
+from data_quality import check_data_quality
 from data_aggregator import aggregate_hourly_data, save_aggregated_data
 from usage_analyzer import add_time_metadata, analyze_patterns
 from rate_calculator import calculate_all_plans, determine_optimal_plan
 from cost_validator import calculate_actual_cost, validate_estimates
 from report_generator import generate_report
+from chunked_pipeline import analyze_in_chunks, CHUNK_MODES
+from storage_optimizer import optimize_all_plans
+from profile_clustering import build_profile, load_profile_model
+from fleet_analyzer import load_fleet_data, analyze_fleet_plans, save_fleet_results
 
 
-def main():
-    """Main entry point for rate analysis."""
-    parser = argparse.ArgumentParser(
-        description='Analyze electricity usage and recommend optimal rate plan'
-    )
-    parser.add_argument(
-        'identifier',
-        help='Dataset identifier (e.g., "test")'
-    )
+def run_fleet(identifier):
+    """
+    Analyze every meter in ./data/<identifier>.csv and save the results.
 
-    args = parser.parse_args()
-    identifier = args.identifier
+    Args:
+        identifier: Fleet identifier
 
-    print(f"\n=== Electricity Rate Analysis ===")
-    print(f"Dataset: {identifier}\n")
+    Returns:
+        str: Path to the fleet results CSV
+    """
+    print(f"\n=== Fleet Rate Analysis ===")
+    print(f"Fleet: {identifier}\n")
 
-    # step 1: load data
-    print("Step 1: Loading data...")
+    print("Loading fleet data...")
     try:
-        df = load_all_files(identifier)
-        print(f"✓ Loaded {len(df)} hourly records\n")
+        df = load_fleet_data(f"./data/{identifier}.csv")
+        print(f"✓ Loaded {len(df)} hourly records for {df['meter_id'].nunique()} meters\n")
     except Exception as e:
-        print(f"✗ Error loading data: {e}")
-        sys.exit(1)
+        print(f"✗ Error loading fleet data: {e}")
+        raise
 
-    # step 2: aggregate data
-    print("Step 2: Aggregating data...")
+    print("Calculating costs for all meters and rate plans...")
     try:
-        aggregated = aggregate_hourly_data(df)
-        csv_path = save_aggregated_data(aggregated, identifier)
-        print(f"✓ Saved aggregated data: {csv_path}\n")
+        results = analyze_fleet_plans(df)
+        csv_path = save_fleet_results(results, identifier)
     except Exception as e:
-        print(f"✗ Error aggregating data: {e}")
-        sys.exit(1)
+        print(f"✗ Error calculating fleet costs: {e}")
+        raise
 
-    # step 3: analyze patterns
-    print("Step 3: Analyzing usage patterns...")
-    try:
-        enriched_df = add_time_metadata(df)
-        analysis = analyze_patterns(enriched_df)
-        print(f"✓ Total consumption: {analysis['total_kwh']:.1f} kWh over {analysis['num_days']} days")
-        print(f"✓ Projected monthly: {analysis['monthly_kwh_projected']:.1f} kWh\n")
-    except Exception as e:
-        print(f"✗ Error analyzing patterns: {e}")
-        sys.exit(1)
+    for plan, count in results['optimal_plan'].value_counts().items():
+        print(f"✓ {plan}: optimal for {count} meters")
+    print(f"✓ Total potential savings: ${results['savings'].sum():.2f}/month\n")
+
+    print("=== Fleet Analysis Complete ===\n")
+    print(f"View fleet results: {csv_path}")
+
+    return csv_path
+
+
+def run_analysis(identifier, chunked=None, impute=False, battery=None, ev=None):
+    """
+    Run the full analysis for one dataset and generate its report.
+
+    Args:
+        identifier: Dataset identifier (e.g., "test")
+        chunked: Chunk mode ("file" or "month"), or None to load everything
+        impute: Fill missing hours with the same hour-of-week median
+        battery: (capacity kWh, power kW) to also optimize a battery, or None
+        ev: (kWh per day, charger kW) to also optimize EV charging, or None
+
+    Returns:
+        str: Path to generated report
+    """
+    if chunked and impute:
+        raise ValueError("imputation needs the whole history at once and is not available with chunked processing")
+
+    print(f"\n=== Electricity Rate Analysis ===")
+    print(f"Dataset: {identifier}\n")
+
+    quality = None
+
+    if chunked:
+        # steps 1-3: load, aggregate and analyze one chunk at a time
+        print(f"Steps 1-3: Loading and analyzing data by {chunked}...")
+        try:
+            analysis, actual_data, csv_path, daily = analyze_in_chunks(identifier, chunked)
+            enriched_df = None
+            print(f"✓ Saved aggregated data: {csv_path}")
+            print(f"✓ Total consumption: {analysis['total_kwh']:.1f} kWh over {analysis['num_days']} days")
+            print(f"✓ Projected monthly: {analysis['monthly_kwh_projected']:.1f} kWh\n")
+        except Exception as e:
+            print(f"✗ Error analyzing data: {e}")
+            raise
+    else:
+        daily = None
+
+        # step 1: load data
+        print("Step 1: Loading data...")
+        try:
+            df = load_all_files(identifier, deduplicate=False)
+            df, quality = check_data_quality(df, impute=impute)
+            print(f"✓ Loaded {len(df)} hourly records")
+            print(f"✓ Coverage: {quality['coverage_pct']:.1f}% "
+                  f"({quality['missing_hours']} missing hours in {quality['gap_count']} gaps, "
+                  f"{quality['duplicate_hours']} duplicates, {quality['outlier_hours']} outliers)")
+            if quality['blank_hours']:
+                print(f"✓ {quality['blank_hours']} of the missing hours are rows with a blank reading")
+            if quality['imputed_hours']:
+                print(f"✓ Imputed {quality['imputed_hours']} missing hours")
+            print()
+        except Exception as e:
+            print(f"✗ Error loading data: {e}")
+            raise
+
+        # step 2: aggregate data
+        print("Step 2: Aggregating data...")
+        try:
+            aggregated = aggregate_hourly_data(df)
+            csv_path = save_aggregated_data(aggregated, identifier)
+            print(f"✓ Saved aggregated data: {csv_path}\n")
+        except Exception as e:
+            print(f"✗ Error aggregating data: {e}")
+            raise
+
+        # step 3: analyze patterns
+        print("Step 3: Analyzing usage patterns...")
+        try:
+            enriched_df = add_time_metadata(df)
+            analysis = analyze_patterns(enriched_df)
+            print(f"✓ Total consumption: {analysis['total_kwh']:.1f} kWh over {analysis['num_days']} days")
+            print(f"✓ Projected monthly: {analysis['monthly_kwh_projected']:.1f} kWh\n")
+        except Exception as e:
+            print(f"✗ Error analyzing patterns: {e}")
+            raise
 
     # step 4: calculate costs
     print("Step 4: Calculating costs for all rate plans...")
     try:
         results = calculate_all_plans(enriched_df, analysis)
-        optimal = determine_optimal_plan(results)
+
+        # short histories fall back on similar customers' plans, if profiled
+        profile = build_profile(enriched_df) if enriched_df is not None else None
+        optimal = determine_optimal_plan(results, analysis, profile, load_profile_model())
+        lowest_cost = determine_optimal_plan(results)
 
         print(f"✓ Tiered: ${results['tiered']['total_cost']:.2f}/month")
         print(f"✓ TOU: ${results['tou']['total_cost']:.2f}/month")
         print(f"✓ ULO: ${results['ulo']['total_cost']:.2f}/month")
-        print(f"\n→ Optimal plan: {optimal}\n")
+        print(f"\n→ Optimal plan: {optimal}")
+        if optimal != lowest_cost:
+            print(f"  (based on customers with similar usage; the {analysis['num_days']} days of data "
+                  f"alone favour {lowest_cost})")
+        print()
     except Exception as e:
         print(f"✗ Error calculating costs: {e}")
-        sys.exit(1)
+        raise
+
+    # optional: costs with battery / EV charging schedules
+    if battery or ev:
+        print("Optimizing battery and EV charging schedules...")
+        try:
+            if enriched_df is None:
+                raise ValueError("schedule optimization needs hourly data and is not available with --chunked")
+            battery_options = {'capacity_kwh': battery[0], 'power_kw': battery[1]} if battery else None
+            ev_options = {'daily_kwh': ev[0], 'power_kw': ev[1]} if ev else None
+            optimized = optimize_all_plans(enriched_df, results, battery_options, ev_options)
+
+            for plan_data in optimized.values():
+                print(f"✓ {plan_data['plan']}: ${plan_data['baseline_cost']:.2f}/month unmanaged, "
+                      f"${plan_data['optimized_cost']:.2f}/month optimized")
+            best = min(optimized.values(), key=lambda x: x['optimized_cost'])
+            print(f"\n→ Optimal plan with optimized schedule: {best['plan']}\n")
+        except Exception as e:
+            print(f"✗ Error optimizing schedules: {e}")
+            raise
 
     # step 5: validate cost estimates
     print("Step 5: Validating cost estimates...")
     try:
-        actual_data = calculate_actual_cost(enriched_df)
+        if enriched_df is not None:
+            actual_data = calculate_actual_cost(enriched_df)
         validation = validate_estimates(actual_data, results, analysis['num_days'])
 
         print(f"✓ Actual cost for {actual_data['period_days']} days: ${actual_data['total_actual_cost']:.2f}")
@@ -86,20 +189,93 @@ def main():
         print(f"✓ Closest match: {validation['closest_plan']} ({validation['accuracy_percentage']:.1f}% accuracy)\n")
     except Exception as e:
         print(f"✗ Error validating costs: {e}")
-        sys.exit(1)
+        raise
 
     # step 6: generate report
     print("Step 6: Generating report...")
     try:
-        report_path = generate_report(analysis, results, identifier, enriched_df, validation)
+        report_path = generate_report(analysis, results, identifier, enriched_df, validation, daily, quality, optimal)
         print(f"✓ Report generated: {report_path}\n")
     except Exception as e:
         print(f"✗ Error generating report: {e}")
-        sys.exit(1)
+        raise
 
     print("=== Analysis Complete ===\n")
     print(f"View your report: {report_path}")
 
+    return report_path
+
+
+def positive_float(value):
+    """Parse a finite, positive float command-line value."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if not (math.isfinite(number) and number > 0):
+        raise argparse.ArgumentTypeError(f"must be a positive number: {value!r}")
+    return number
+
+
+def main():
+    """Main entry point for rate analysis."""
+    parser = argparse.ArgumentParser(
+        description='Analyze electricity usage and recommend optimal rate plan'
+    )
+    parser.add_argument(
+        'identifier',
+        help='Dataset identifier (e.g., "test")'
+    )
+    parser.add_argument(
+        '--fleet',
+        action='store_true',
+        help='Treat identifier as a fleet CSV (./data/<identifier>.csv) with meter_id, datetime, kwh, cost columns'
+    )
+    parser.add_argument(
+        '--chunked',
+        choices=CHUNK_MODES,
+        help='Process the history in bounded-size chunks (per file or per month) to limit memory use'
+    )
+    parser.add_argument(
+        '--impute',
+        action='store_true',
+        help='Fill missing hours with the median for the same hour of week'
+    )
+    parser.add_argument(
+        '--battery',
+        nargs=2,
+        type=positive_float,
+        metavar=('KWH', 'KW'),
+        help='Also report costs with an optimally scheduled battery of this capacity and power'
+    )
+    parser.add_argument(
+        '--ev',
+        nargs=2,
+        type=positive_float,
+        metavar=('KWH_PER_DAY', 'KW'),
+        help='Also report costs with EV charging of this daily energy and charger power'
+    )
+
+    args = parser.parse_args()
+    identifier = args.identifier
+
+    if args.chunked and args.impute:
+        parser.error('--impute needs the whole history at once and cannot be combined with --chunked')
+
+    if args.fleet:
+        ignored = [flag for flag, value in [('--chunked', args.chunked), ('--impute', args.impute),
+                                            ('--battery', args.battery), ('--ev', args.ev)] if value]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} cannot be combined with --fleet")
+
+    try:
+        if args.fleet:
+            run_fleet(identifier)
+        else:
+            run_analysis(identifier, args.chunked, args.impute, args.battery, args.ev)
+    except Exception:
+        sys.exit(1)
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,280 @@
+"""Analyze long usage histories in bounded-size chunks."""
+
+import os
+import tempfile
+from itertools import groupby
+import numpy as np
+import pandas as pd
+from data_loader import list_data_files, load_files
+from data_aggregator import aggregate_hourly_data, append_aggregated_block, save_aggregated_blocks
+from usage_analyzer import add_time_metadata, daily_period_kwh
+from cost_validator import monthly_from_billed_hours
+
+
+CHUNK_MODES = ('file', 'month')
+
+
+def iter_file_chunks(identifier, chunk_by='month'):
+    """
+    Group an identifier's Excel files into chunks.
+
+    Files sharing a date always land in the same chunk so duplicate
+    hours can be removed within the chunk.
+
+    Args:
+        identifier: Dataset identifier (e.g., "test")
+        chunk_by: "file" (one chunk per date) or "month"
+
+    Yields:
+        list: (file_date, filepath, filename) tuples for one chunk
+    """
+    if chunk_by not in CHUNK_MODES:
+        raise ValueError(f"Unknown chunk mode: {chunk_by} (expected one of {', '.join(CHUNK_MODES)})")
+
+    if chunk_by == 'month':
+        key = lambda x: (x[0].year, x[0].month)
+    else:
+        key = lambda x: x[0]
+
+    for _, files in groupby(list_data_files(identifier), key=key):
+        yield list(files)
+
+
+def empty_partial():
+    """
+    Create an empty partial aggregate.
+
+    Returns:
+        dict: Partial aggregate with zeroed sums and empty day sets
+    """
+    return {
+        'records': 0,
+        'total_kwh': 0.0,
+        'total_actual_cost': 0.0,
+        'billed_hours': 0,
+        'weekday_kwh': 0.0,
+        'weekend_kwh': 0.0,
+        # only periods that occurred, as groupby().sum() would report
+        'tou_kwh': {},
+        'ulo_kwh': {},
+        # row 0 is weekdays, row 1 is weekends
+        'hourly_sum': np.zeros((2, 24)),
+        'hourly_count': np.zeros((2, 24), dtype=np.int64),
+        'weekday_dates': set(),
+        'weekend_dates': set(),
+        # daily kWh per pricing period, one frame per chunk, for report charts
+        'daily': [],
+        'start': None,
+        'end': None
+    }
+
+
+def summarize_chunk(df):
+    """
+    Reduce one chunk of enriched hourly data to a partial aggregate.
+
+    Args:
+        df: DataFrame with time metadata (from add_time_metadata)
+
+    Returns:
+        dict: Partial aggregate for the chunk
+    """
+    partial = empty_partial()
+    if df.empty:
+        return partial
+
+    is_weekend = df['is_weekend'].to_numpy()
+    kwh = df['kwh'].to_numpy(dtype=float)
+    dates = df['datetime'].dt.date
+
+    partial['records'] = len(df)
+    partial['total_kwh'] = float(np.nansum(kwh))
+    partial['total_actual_cost'] = float(df['actual_cost'].sum())
+    partial['billed_hours'] = int(df['actual_cost'].count())
+    partial['weekday_kwh'] = float(np.nansum(kwh[~is_weekend]))
+    partial['weekend_kwh'] = float(np.nansum(kwh[is_weekend]))
+
+    for period, value in df.groupby('tou_period')['kwh'].sum().items():
+        partial['tou_kwh'][period] = float(value)
+    for period, value in df.groupby('ulo_period')['kwh'].sum().items():
+        partial['ulo_kwh'][period] = float(value)
+
+    # hourly sums and counts, ignoring missing readings like groupby().mean()
+    valid = ~np.isnan(kwh)
+    rows = is_weekend.astype(int)[valid]
+    hours = df['hour'].to_numpy()[valid]
+    np.add.at(partial['hourly_sum'], (rows, hours), kwh[valid])
+    np.add.at(partial['hourly_count'], (rows, hours), 1)
+
+    partial['weekday_dates'] = set(dates[~is_weekend])
+    partial['weekend_dates'] = set(dates[is_weekend])
+    partial['daily'] = [daily_period_kwh(df)]
+    partial['start'] = df['datetime'].min()
+    partial['end'] = df['datetime'].max()
+
+    return partial
+
+
+def merge_partials(left, right):
+    """
+    Merge two partial aggregates.
+
+    Args:
+        left: Partial aggregate
+        right: Partial aggregate
+
+    Returns:
+        dict: Combined partial aggregate
+    """
+    starts = [p['start'] for p in (left, right) if p['start'] is not None]
+    ends = [p['end'] for p in (left, right) if p['end'] is not None]
+
+    return {
+        'records': left['records'] + right['records'],
+        'total_kwh': left['total_kwh'] + right['total_kwh'],
+        'total_actual_cost': left['total_actual_cost'] + right['total_actual_cost'],
+        'billed_hours': left['billed_hours'] + right['billed_hours'],
+        'weekday_kwh': left['weekday_kwh'] + right['weekday_kwh'],
+        'weekend_kwh': left['weekend_kwh'] + right['weekend_kwh'],
+        'tou_kwh': _merge_sums(left['tou_kwh'], right['tou_kwh']),
+        'ulo_kwh': _merge_sums(left['ulo_kwh'], right['ulo_kwh']),
+        'hourly_sum': left['hourly_sum'] + right['hourly_sum'],
+        'hourly_count': left['hourly_count'] + right['hourly_count'],
+        'weekday_dates': left['weekday_dates'] | right['weekday_dates'],
+        'weekend_dates': left['weekend_dates'] | right['weekend_dates'],
+        'daily': left['daily'] + right['daily'],
+        'start': min(starts) if starts else None,
+        'end': max(ends) if ends else None
+    }
+
+
+def _merge_sums(left, right):
+    """Add two {key: value} dicts key by key."""
+    merged = dict(left)
+    for key, value in right.items():
+        merged[key] = merged.get(key, 0.0) + value
+    return merged
+
+
+def finalize_analysis(partial):
+    """
+    Turn a partial aggregate into usage statistics.
+
+    Args:
+        partial: Partial aggregate covering the whole history
+
+    Returns:
+        dict: Statistics in the same format as analyze_patterns, plus
+        start_datetime and end_datetime
+    """
+    if partial['records'] == 0:
+        raise ValueError("No data was successfully loaded")
+
+    total_kwh = partial['total_kwh']
+    num_days = len(partial['weekday_dates'] | partial['weekend_dates'])
+
+    # average consumption by hour, for hours that have readings
+    hourly = {}
+    for row, name in enumerate(['weekday_hourly', 'weekend_hourly']):
+        counts = partial['hourly_count'][row]
+        sums = partial['hourly_sum'][row]
+        hourly[name] = {hour: sums[hour] / counts[hour] for hour in range(24) if counts[hour] > 0}
+
+    return {
+        'total_kwh': total_kwh,
+        'num_days': num_days,
+        'num_weekdays': len(partial['weekday_dates']),
+        'num_weekends': len(partial['weekend_dates']),
+        'weekday_kwh': partial['weekday_kwh'],
+        'weekend_kwh': partial['weekend_kwh'],
+        'avg_daily_kwh': total_kwh / num_days,
+        'weekday_hourly': hourly['weekday_hourly'],
+        'weekend_hourly': hourly['weekend_hourly'],
+        'tou_breakdown': dict(partial['tou_kwh']),
+        'ulo_breakdown': dict(partial['ulo_kwh']),
+        'monthly_kwh_projected': (total_kwh / num_days) * 30,
+        'start_datetime': partial['start'],
+        'end_datetime': partial['end']
+    }
+
+
+def daily_from_partial(partial):
+    """
+    Combine the per-chunk daily frames of a partial aggregate.
+
+    Chunks never share a date, so the frames are concatenated once.
+
+    Args:
+        partial: Partial aggregate covering the whole history
+
+    Returns:
+        DataFrame from daily_period_kwh covering every chunk, or None if
+        there are no chunks
+    """
+    if not partial['daily']:
+        return None
+    return pd.concat(partial['daily']).sort_index()
+
+
+def actual_cost_from_partial(partial):
+    """
+    Calculate actual cost totals from a partial aggregate.
+
+    Args:
+        partial: Partial aggregate covering the whole history
+
+    Returns:
+        dict: Same format as calculate_actual_cost
+    """
+    total_actual_cost = partial['total_actual_cost']
+    period_days = (partial['end'] - partial['start']).days + 1
+
+    return {
+        'total_actual_cost': total_actual_cost,
+        'period_days': period_days,
+        'billed_hours': partial['billed_hours'],
+        'projected_monthly_actual': monthly_from_billed_hours(total_actual_cost, partial['billed_hours'])
+    }
+
+
+def analyze_in_chunks(identifier, chunk_by='month'):
+    """
+    Load, classify and aggregate an identifier's history chunk by chunk.
+
+    Only one chunk of hourly records is held in memory at a time: each
+    chunk's hours-by-days block goes to a scratch file and the aggregated
+    CSV is stitched together from it at the end.
+
+    Args:
+        identifier: Dataset identifier (e.g., "test")
+        chunk_by: "file" (one chunk per date) or "month"
+
+    Returns:
+        tuple: (analysis, actual_data, csv_path, daily) where csv_path is
+        the saved hours-by-days CSV and daily is the days-by-periods
+        matrix from daily_period_kwh
+    """
+    partial = empty_partial()
+    block_offsets = []
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        scratch_path = os.path.join(scratch_dir, 'aggregated.csv')
+
+        with open(scratch_path, 'wb') as scratch:
+            for files in iter_file_chunks(identifier, chunk_by):
+                try:
+                    chunk = load_files(files)
+                except ValueError as e:
+                    print(f"Skipping chunk starting {files[0][0]}: {e}")
+                    continue
+
+                enriched = add_time_metadata(chunk)
+                partial = merge_partials(partial, summarize_chunk(enriched))
+                block_offsets.append(append_aggregated_block(scratch, aggregate_hourly_data(chunk)))
+
+        analysis = finalize_analysis(partial)
+        csv_path = save_aggregated_blocks(scratch_path, block_offsets, identifier)
+
+    actual_data = actual_cost_from_partial(partial)
+
+    return analysis, actual_data, csv_path, daily_from_partial(partial)
@@ -7,6 +7,9 @@ def calculate_actual_cost(df):
     """
     Calculate total actual cost from raw data.
 
+    The monthly projection is based on billed hours only, so hours with
+    no billed cost (gaps, or imputed readings) do not dilute it.
+
     Args:
         df: DataFrame with actual_cost column
 
@@ -14,6 +17,7 @@ def calculate_actual_cost(df):
         dict: {
             'total_actual_cost': float,
             'period_days': int,
+            'billed_hours': int,
             'projected_monthly_actual': float
         }
     """
@@ -23,16 +27,34 @@ def calculate_actual_cost(df):
     # calculate number of days in period
     period_days = (df['datetime'].max() - df['datetime'].min()).days + 1
 
-    # project to monthly cost (30 days)
-    projected_monthly_actual = (total_actual_cost / period_days) * 30
+    # project to monthly cost (30 days of 24 billed hours)
+    billed_hours = int(df['actual_cost'].count())
+    projected_monthly_actual = monthly_from_billed_hours(total_actual_cost, billed_hours)
 
     return {
         'total_actual_cost': total_actual_cost,
         'period_days': period_days,
+        'billed_hours': billed_hours,
         'projected_monthly_actual': projected_monthly_actual
     }
 
 
+def monthly_from_billed_hours(total_actual_cost, billed_hours):
+    """
+    Project a billed total to a 30-day month.
+
+    Args:
+        total_actual_cost: Sum of billed cost
+        billed_hours: Number of hours with a billed cost
+
+    Returns:
+        float: Projected monthly cost (0 if nothing was billed)
+    """
+    if not billed_hours:
+        return 0.0
+    return total_actual_cost / billed_hours * 24 * 30
+
+
 def validate_estimates(actual_data, estimated_results, num_days):
     """
     Compare estimated costs against actual costs.
@@ -43,3 +43,55 @@ def save_aggregated_data(df, identifier):
     df.to_csv(output_path)
 
     return output_path
+
+
+def append_aggregated_block(handle, block):
+    """
+    Append one block of day columns to a scratch file.
+
+    Args:
+        handle: Scratch file opened in binary write mode
+        block: DataFrame from aggregate_hourly_data
+
+    Returns:
+        list: Byte offsets of the block's header and 24 hour rows
+    """
+    block = block.reindex(pd.RangeIndex(24, name='hour'))
+
+    offsets = []
+    for line in block.to_csv().splitlines():
+        offsets.append(handle.tell())
+        handle.write(line.encode('utf-8') + b'\n')
+
+    return offsets
+
+
+def save_aggregated_blocks(scratch_path, block_offsets, identifier):
+    """
+    Stitch blocks written by append_aggregated_block into one CSV.
+
+    Rows are assembled one at a time by reading each block's matching
+    line, so only a single output row is held in memory.
+
+    Args:
+        scratch_path: Scratch file written by append_aggregated_block
+        block_offsets: Offsets returned for each block, in date order
+        identifier: Dataset identifier
+
+    Returns:
+        str: Path to saved file
+    """
+    output_dir = "./output/data"
+    os.makedirs(output_dir, exist_ok=True)
+
+    output_path = os.path.join(output_dir, f"{identifier}_aggregated.csv")
+    with open(scratch_path, 'rb') as scratch, open(output_path, 'w') as f:
+        for row in range(25):
+            values = []
+            for offsets in block_offsets:
+                scratch.seek(offsets[row])
+                label, _, line = scratch.readline().decode('utf-8').rstrip('\n').partition(',')
+                values.append(line)
+            f.write(label + ',' + ','.join(values) + '\n')
+
+    return output_path
@@ -76,15 +76,15 @@ def load_single_file(filepath):
     return result
 
 
-def load_all_files(identifier):
+def list_data_files(identifier):
     """
-    Load all Excel files for a given identifier.
+    List all Excel files for a given identifier, sorted by date.
 
     Args:
         identifier: Dataset identifier (e.g., "test")
 
     Returns:
-        DataFrame with all hourly data combined
+        list: (file_date, filepath, filename) tuples sorted by date
     """
     data_dir = f"./data/{identifier}"
 
@@ -109,7 +109,20 @@ def load_all_files(identifier):
     # sort by date
     files_with_dates.sort(key=lambda x: x[0])
 
-    # load and combine all files
+    return files_with_dates
+
+
+def load_files(files_with_dates, deduplicate=True):
+    """
+    Load and combine a list of Excel files.
+
+    Args:
+        files_with_dates: (file_date, filepath, filename) tuples
+        deduplicate: Drop repeated timestamps, keeping the first
+
+    Returns:
+        DataFrame with hourly data combined and sorted
+    """
     all_data = []
     for file_date, filepath, filename in files_with_dates:
         try:
@@ -126,6 +139,22 @@ def load_all_files(identifier):
     combined = pd.concat(all_data, ignore_index=True)
 
     # sort by datetime and remove any duplicates
-    combined = combined.sort_values('datetime').drop_duplicates(subset='datetime').reset_index(drop=True)
+    combined = combined.sort_values('datetime', kind='stable')
+    if deduplicate:
+        combined = combined.drop_duplicates(subset='datetime')
+
+    return combined.reset_index(drop=True)
 
-    return combined
+
+def load_all_files(identifier, deduplicate=True):
+    """
+    Load all Excel files for a given identifier.
+
+    Args:
+        identifier: Dataset identifier (e.g., "test")
+        deduplicate: Drop repeated timestamps, keeping the first
+
+    Returns:
+        DataFrame with all hourly data combined
+    """
+    return load_files(list_data_files(identifier), deduplicate)
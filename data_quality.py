@@ -0,0 +1,165 @@
+"""Detect and repair gaps, duplicates and outliers in hourly usage data."""
+
+import numpy as np
+import pandas as pd
+
+
+# modified z-score above which a reading is flagged as an outlier; hourly
+# household usage is spiky, so this is well above the usual 3.5
+OUTLIER_THRESHOLD = 5.0
+
+# number of longest gaps listed in the quality summary
+MAX_REPORTED_GAPS = 10
+
+
+def find_gaps(missing, index):
+    """
+    Find runs of consecutive missing hours.
+
+    Args:
+        missing: Boolean array, True where an hour is missing
+        index: DatetimeIndex aligned with missing
+
+    Returns:
+        DataFrame with start, end and hours for each gap
+    """
+    edges = np.diff(np.concatenate([[0], missing.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    return pd.DataFrame({
+        'start': index[starts],
+        'end': index[ends - 1],
+        'hours': ends - starts
+    })
+
+
+def flag_outliers(kwh, hour, threshold=OUTLIER_THRESHOLD):
+    """
+    Flag readings far above the typical value for their hour of day.
+
+    Uses the modified z-score (median and median absolute deviation per
+    hour of day, which has enough samples for a stable spread even on
+    short histories). Negative readings are always flagged.
+
+    Args:
+        kwh: Series of hourly kWh (missing values allowed)
+        hour: Series of hours of day (0-23)
+        threshold: Modified z-score above which a reading is an outlier
+
+    Returns:
+        Series of booleans, True for outliers
+    """
+    median = kwh.groupby(hour).transform('median')
+    deviation = (kwh - median).abs()
+    mad = deviation.groupby(hour).transform('median')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = 0.6745 * (kwh - median) / mad
+
+    return (kwh < 0) | ((mad > 0) & (z > threshold))
+
+
+def impute_by_hour_of_week(values, hour_of_week, hour, usable):
+    """
+    Fill missing values with the median for the same hour of week.
+
+    Falls back to the same hour of day, then to the overall median, when
+    an hour of week has no usable readings.
+
+    Args:
+        values: Series with missing values to fill
+        hour_of_week: Series of hour-of-week keys (0-167)
+        hour: Series of hours of day (0-23)
+        usable: Boolean Series, True for readings to take medians from
+
+    Returns:
+        Series with missing values filled
+    """
+    reference = values.where(usable)
+
+    filled = values.fillna(reference.groupby(hour_of_week).transform('median'))
+    filled = filled.fillna(reference.groupby(hour).transform('median'))
+    filled = filled.fillna(reference.median())
+
+    return filled
+
+
+def check_data_quality(df, impute=False, outlier_threshold=OUTLIER_THRESHOLD):
+    """
+    Validate hourly data against a complete hourly calendar.
+
+    Reindexes the data onto every hour from the first to the last day,
+    flags gaps, duplicate timestamps and outliers, and optionally imputes
+    missing hours.
+
+    Args:
+        df: DataFrame with datetime, kwh and actual_cost columns (duplicate
+            timestamps allowed)
+        impute: Fill missing readings' kWh with the same hour-of-week
+            median; their actual_cost is left as it was
+        outlier_threshold: Modified z-score above which a reading is flagged
+
+    Returns:
+        tuple: (DataFrame, quality) where the DataFrame has one row per hour
+        with added is_outlier and is_imputed columns and quality is a dict
+        of coverage stats. Hours with no row at all are dropped unless
+        imputed; rows with a blank reading are always kept, along with
+        their billed cost
+    """
+    # duplicates: repeated timestamps, and those whose readings disagree
+    duplicated = df.duplicated(subset='datetime', keep='first')
+    conflicting = int((df.groupby('datetime')['kwh'].nunique() > 1).sum())
+
+    deduped = df[~duplicated].set_index('datetime')[['kwh', 'actual_cost']]
+
+    # reindex onto every hour of every day in the range
+    start = deduped.index.min().normalize()
+    end = deduped.index.max().normalize() + pd.Timedelta(hours=23)
+    full_index = pd.date_range(start, end, freq='h', name='datetime')
+    absent = ~full_index.isin(deduped.index)
+    full = deduped.reindex(full_index).reset_index()
+
+    # missing readings are hours with no row or with a blank kWh value
+    missing = full['kwh'].isna().to_numpy()
+    gaps = find_gaps(missing, full_index)
+
+    # per-day coverage; the index always spans whole days
+    missing_per_day = missing.reshape(-1, 24).sum(axis=1)
+
+    hour = full['datetime'].dt.hour
+    hour_of_week = full['datetime'].dt.dayofweek * 24 + hour
+    full.loc[:, 'is_outlier'] = flag_outliers(full['kwh'], hour, outlier_threshold)
+    full.loc[:, 'is_imputed'] = False
+
+    if impute:
+        usable = ~full['kwh'].isna() & ~full['is_outlier']
+        full.loc[:, 'kwh'] = impute_by_hour_of_week(full['kwh'], hour_of_week, hour, usable)
+        # billed cost is never imputed: validation compares against real bills only
+        full.loc[:, 'is_imputed'] = missing
+    else:
+        # blank readings keep their row so their billed cost still counts
+        full = full[~absent].reset_index(drop=True)
+
+    expected_hours = len(full_index)
+    missing_hours = int(missing.sum())
+    longest = gaps.nlargest(MAX_REPORTED_GAPS, 'hours').sort_values('start')
+
+    quality = {
+        'expected_hours': expected_hours,
+        'observed_hours': expected_hours - missing_hours,
+        'missing_hours': missing_hours,
+        'blank_hours': int((missing & ~absent).sum()),
+        'coverage_pct': (expected_hours - missing_hours) / expected_hours * 100,
+        'duplicate_hours': int(duplicated.sum()),
+        'conflicting_duplicates': conflicting,
+        'outlier_hours': int(full['is_outlier'].sum()),
+        'gap_count': len(gaps),
+        'longest_gap_hours': int(gaps['hours'].max()) if len(gaps) else 0,
+        'missing_days': int((missing_per_day == 24).sum()),
+        'partial_days': int(((missing_per_day > 0) & (missing_per_day < 24)).sum()),
+        'imputed_hours': int(full['is_imputed'].sum()),
+        'gaps': longest.to_dict('records')
+    }
+
+    return full, quality
@@ -0,0 +1,192 @@
+"""Analyze and price many meters at once from a single long dataframe."""
+
+import os
+import pandas as pd
+from rate_plans import PLAN_NAMES, TOU_RATES, ULO_RATES, TOU_PERIODS, ULO_PERIODS
+from rate_calculator import calculate_tiered_costs
+from usage_analyzer import add_time_metadata
+
+
+def load_fleet_data(path):
+    """
+    Load a long-format fleet CSV file.
+
+    Args:
+        path: Path to CSV with columns meter_id, datetime, kwh and
+            optionally cost (or actual_cost)
+
+    Returns:
+        DataFrame with columns: meter_id, datetime, kwh, actual_cost
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"Fleet data file not found: {path}")
+
+    df = pd.read_csv(path, parse_dates=['datetime'])
+
+    return prepare_fleet_data(df)
+
+
+def prepare_fleet_data(df):
+    """
+    Normalize a long-format fleet dataframe.
+
+    Args:
+        df: DataFrame with columns meter_id, datetime, kwh and optionally
+            cost (or actual_cost)
+
+    Returns:
+        DataFrame sorted by meter and datetime, duplicates removed
+    """
+    df = df.rename(columns={'cost': 'actual_cost'})
+
+    missing = {'meter_id', 'datetime', 'kwh'} - set(df.columns)
+    if missing:
+        raise ValueError(f"Fleet data is missing columns: {', '.join(sorted(missing))}")
+
+    if 'actual_cost' not in df.columns:
+        df = df.assign(actual_cost=float('nan'))
+
+    df = df[['meter_id', 'datetime', 'kwh', 'actual_cost']]
+
+    # sort by meter and datetime and remove any duplicates
+    df = df.sort_values(['meter_id', 'datetime']).drop_duplicates(subset=['meter_id', 'datetime'])
+
+    return df.reset_index(drop=True)
+
+
+def analyze_fleet(df):
+    """
+    Compute usage statistics for every meter in one grouped pass.
+
+    Args:
+        df: Fleet DataFrame from prepare_fleet_data
+
+    Returns:
+        DataFrame indexed by meter_id with total_kwh, num_days,
+        monthly_kwh_projected, per-period kWh columns
+        (tou_<period>_kwh, ulo_<period>_kwh) and actual cost columns
+    """
+    df = add_time_metadata(df)
+    df.loc[:, 'date'] = df['datetime'].dt.normalize()
+
+    grouped = df.groupby('meter_id')
+    stats = pd.DataFrame({
+        'total_kwh': grouped['kwh'].sum(),
+        'num_days': grouped['date'].nunique(),
+        'total_actual_cost': grouped['actual_cost'].sum(min_count=1),
+        'billed_hours': grouped['actual_cost'].count(),
+        'period_days': (grouped['datetime'].max() - grouped['datetime'].min()).dt.days + 1
+    })
+
+    # consumption by pricing period, one column per period
+    tou = df.pivot_table(index='meter_id', columns='tou_period', values='kwh', aggfunc='sum')
+    tou = tou.reindex(columns=list(TOU_PERIODS)).fillna(0)
+    ulo = df.pivot_table(index='meter_id', columns='ulo_period', values='kwh', aggfunc='sum')
+    ulo = ulo.reindex(columns=list(ULO_PERIODS)).fillna(0)
+
+    for period in TOU_PERIODS:
+        stats[f'tou_{period}_kwh'] = tou[period]
+    for period in ULO_PERIODS:
+        stats[f'ulo_{period}_kwh'] = ulo[period]
+
+    # monthly projection
+    stats['monthly_kwh_projected'] = stats['total_kwh'] / stats['num_days'] * 30
+    # actual cost per billed hour, as cost_validator.calculate_actual_cost
+    stats['projected_monthly_actual'] = stats['total_actual_cost'] / stats['billed_hours'].where(stats['billed_hours'] > 0) * 24 * 30
+
+    return stats
+
+
+def calculate_fleet_costs(stats):
+    """
+    Calculate projected monthly costs for all plans and all meters.
+
+    Mirrors the per-plan logic in rate_calculator, applied column-wise.
+
+    Args:
+        stats: DataFrame from analyze_fleet
+
+    Returns:
+        DataFrame indexed by meter_id with one cost column per plan
+    """
+    monthly_kwh = stats['monthly_kwh_projected']
+    monthly_multiplier = 30 / stats['num_days']
+
+    # tiered plan
+    tiered = calculate_tiered_costs(monthly_kwh)
+
+    # time-based plans: period kWh times period rate
+    tou_kwh = stats[[f'tou_{period}_kwh' for period in TOU_PERIODS]].to_numpy()
+    tou_rates = [TOU_RATES[period] for period in TOU_PERIODS]
+    tou = tou_kwh @ tou_rates * monthly_multiplier
+
+    ulo_kwh = stats[[f'ulo_{period}_kwh' for period in ULO_PERIODS]].to_numpy()
+    ulo_rates = [ULO_RATES[period] for period in ULO_PERIODS]
+    ulo = ulo_kwh @ ulo_rates * monthly_multiplier
+
+    return pd.DataFrame({
+        'Tiered': tiered,
+        'TOU': tou,
+        'ULO': ulo
+    }, index=stats.index)
+
+
+def determine_fleet_optimal(costs):
+    """
+    Determine the optimal plan and savings for every meter.
+
+    Args:
+        costs: DataFrame from calculate_fleet_costs
+
+    Returns:
+        DataFrame indexed by meter_id with optimal_plan, optimal_cost
+        and savings compared to the most expensive plan
+    """
+    plan_costs = costs[list(PLAN_NAMES)]
+
+    # ties resolve to the first plan, as in determine_optimal_plan
+    return pd.DataFrame({
+        'optimal_plan': plan_costs.idxmin(axis=1),
+        'optimal_cost': plan_costs.min(axis=1),
+        'savings': plan_costs.max(axis=1) - plan_costs.min(axis=1)
+    }, index=costs.index)
+
+
+def analyze_fleet_plans(df):
+    """
+    Run the full fleet analysis.
+
+    Args:
+        df: Fleet DataFrame from load_fleet_data or prepare_fleet_data
+
+    Returns:
+        DataFrame indexed by meter_id with usage statistics, plan costs,
+        optimal plan and savings
+    """
+    stats = analyze_fleet(df)
+    costs = calculate_fleet_costs(stats)
+    optimal = determine_fleet_optimal(costs)
+
+    results = stats.join(costs.add_suffix('_cost')).join(optimal)
+
+    return results
+
+
+def save_fleet_results(results, identifier):
+    """
+    Save fleet results to CSV.
+
+    Args:
+        results: DataFrame from analyze_fleet_plans
+        identifier: Fleet identifier
+
+    Returns:
+        str: Path to saved file
+    """
+    output_dir = "./output/data"
+    os.makedirs(output_dir, exist_ok=True)
+
+    output_path = os.path.join(output_dir, f"{identifier}_fleet.csv")
+    results.to_csv(output_path)
+
+    return output_path
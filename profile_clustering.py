@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Hour-of-week load profiles clustered across datasets.
+
+Builds a 168-value profile (average kWh for each hour of the week) for
+every identifier or fleet meter, caches them as a NumPy matrix, groups
+them with k-means and records which plan is optimal within each cluster.
+Customers with too few days of data can then borrow their cluster's plan.
+"""
+
+import os
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+from rate_plans import PLAN_NAMES
+
+
+HOURS_PER_WEEK = 168
+
+# below this many days a dataset's own recommendation is considered unreliable
+MIN_DAYS_FOR_RECOMMENDATION = 21
+
+PROFILE_DIR = './output/profiles'
+
+# rows processed at once when scanning the profile matrix
+BLOCK_SIZE = 65536
+
+
+def _fill_profiles(matrix):
+    """Fill missing hours of week from the same hour of day, then the row mean."""
+    by_day = matrix.reshape(len(matrix), 7, 24)
+    with warnings.catch_warnings():
+        # all-missing slices are expected here and filled below
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        hour_mean = np.nanmean(by_day, axis=1, keepdims=True)
+        row_mean = np.nanmean(matrix, axis=1, keepdims=True)
+
+    by_day = np.where(np.isnan(by_day), hour_mean, by_day)
+    matrix = by_day.reshape(len(matrix), HOURS_PER_WEEK)
+    matrix = np.where(np.isnan(matrix), row_mean, matrix)
+
+    return np.nan_to_num(matrix).astype(np.float32)
+
+
+def build_profile(df):
+    """
+    Build the hour-of-week profile for one dataset.
+
+    Args:
+        df: DataFrame with datetime and kwh columns
+
+    Returns:
+        ndarray: 168 average kWh values, Monday 00:00 first
+    """
+    hour_of_week = df['datetime'].dt.dayofweek * 24 + df['datetime'].dt.hour
+    means = df.groupby(hour_of_week)['kwh'].mean().reindex(range(HOURS_PER_WEEK))
+
+    return _fill_profiles(means.to_numpy(dtype=float)[None, :])[0]
+
+
+def build_fleet_profiles(df):
+    """
+    Build hour-of-week profiles for every meter in one grouped pass.
+
+    Args:
+        df: Fleet DataFrame with meter_id, datetime and kwh columns
+
+    Returns:
+        tuple: (meter ids, (meters, 168) float32 matrix)
+    """
+    hour_of_week = df['datetime'].dt.dayofweek * 24 + df['datetime'].dt.hour
+    means = df.groupby([df['meter_id'], hour_of_week])['kwh'].mean().unstack()
+    means = means.reindex(columns=range(HOURS_PER_WEEK))
+
+    return means.index.to_numpy(), _fill_profiles(means.to_numpy(dtype=float))
+
+
+def profiles_for_identifiers(identifiers):
+    """
+    Build profiles and optimal plans for a list of dataset identifiers.
+
+    Args:
+        identifiers: Dataset identifiers with data under ./data/
+
+    Returns:
+        tuple: (index, matrix) where index is a DataFrame with identifier,
+        num_days and optimal_plan, and matrix is (identifiers, 168)
+    """
+    from data_loader import load_all_files
+    from usage_analyzer import add_time_metadata, analyze_patterns
+    from rate_calculator import calculate_all_plans, determine_optimal_plan
+
+    rows = []
+    profiles = []
+    for identifier in identifiers:
+        try:
+            enriched_df = add_time_metadata(load_all_files(identifier))
+        except ValueError as e:
+            print(f"Skipping {identifier}: {e}")
+            continue
+
+        analysis = analyze_patterns(enriched_df)
+        results = calculate_all_plans(enriched_df, analysis)
+        rows.append({
+            'identifier': identifier,
+            'num_days': analysis['num_days'],
+            'optimal_plan': determine_optimal_plan(results)
+        })
+        profiles.append(build_profile(enriched_df))
+
+    if not rows:
+        raise ValueError("No profiles could be built")
+
+    return pd.DataFrame(rows), np.vstack(profiles)
+
+
+def profiles_for_fleet(df):
+    """
+    Build profiles and optimal plans for every meter in a fleet.
+
+    Args:
+        df: Fleet DataFrame from load_fleet_data or prepare_fleet_data
+
+    Returns:
+        tuple: (index, matrix) as for profiles_for_identifiers, keyed by
+        meter_id
+    """
+    from fleet_analyzer import analyze_fleet_plans
+
+    results = analyze_fleet_plans(df)
+    meter_ids, matrix = build_fleet_profiles(df)
+
+    index = pd.DataFrame({
+        'identifier': meter_ids,
+        'num_days': results.loc[meter_ids, 'num_days'].to_numpy(),
+        'optimal_plan': results.loc[meter_ids, 'optimal_plan'].to_numpy()
+    })
+
+    return index, matrix
+
+
+def save_profiles(index, matrix, profile_dir=PROFILE_DIR):
+    """
+    Cache profiles as profiles.npy with a profile_index.csv alongside.
+
+    Args:
+        index: DataFrame with identifier, num_days and optimal_plan
+        matrix: (rows, 168) profile matrix
+        profile_dir: Output directory
+
+    Returns:
+        str: Path to saved matrix
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+
+    matrix_path = os.path.join(profile_dir, 'profiles.npy')
+    np.save(matrix_path, np.asarray(matrix, dtype=np.float32))
+    index.to_csv(os.path.join(profile_dir, 'profile_index.csv'), index=False)
+
+    return matrix_path
+
+
+def load_profiles(profile_dir=PROFILE_DIR):
+    """
+    Load cached profiles, memory-mapping the matrix.
+
+    Args:
+        profile_dir: Directory written by save_profiles
+
+    Returns:
+        tuple: (index DataFrame, read-only memory-mapped matrix)
+    """
+    matrix_path = os.path.join(profile_dir, 'profiles.npy')
+    if not os.path.exists(matrix_path):
+        raise ValueError(f"Profile matrix not found: {matrix_path}")
+
+    index = pd.read_csv(os.path.join(profile_dir, 'profile_index.csv'))
+    matrix = np.load(matrix_path, mmap_mode='r')
+
+    return index, matrix
+
+
+def _squared_distances(X, centroids):
+    """Squared Euclidean distances between rows of X and each centroid."""
+    X = np.asarray(X, dtype=np.float32)
+    distances = (
+        (X * X).sum(axis=1)[:, None]
+        - 2 * X @ centroids.T
+        + (centroids * centroids).sum(axis=1)[None, :]
+    )
+    return np.maximum(distances, 0)
+
+
+def assign_clusters(X, centroids, block_size=BLOCK_SIZE):
+    """
+    Assign each row of X to its nearest centroid.
+
+    Args:
+        X: (rows, 168) profiles, may be memory-mapped
+        centroids: (k, 168) centroids
+        block_size: Rows processed at once
+
+    Returns:
+        tuple: (labels, squared distance to the assigned centroid)
+    """
+    labels = np.empty(len(X), dtype=np.int32)
+    distances = np.empty(len(X), dtype=np.float32)
+
+    for start in range(0, len(X), block_size):
+        block = slice(start, start + block_size)
+        block_distances = _squared_distances(X[block], centroids)
+        labels[block] = block_distances.argmin(axis=1)
+        distances[block] = block_distances.min(axis=1)
+
+    return labels, distances
+
+
+def kmeans(X, k, n_iter=100, seed=0, block_size=BLOCK_SIZE):
+    """
+    Cluster rows of X with k-means (k-means++ initialization).
+
+    Args:
+        X: (rows, 168) profiles, may be memory-mapped
+        k: Number of clusters
+        n_iter: Maximum number of iterations
+        seed: Random seed
+        block_size: Rows processed at once
+
+    Returns:
+        tuple: (centroids (k, 168), labels (rows,))
+    """
+    n = len(X)
+    if n < k:
+        raise ValueError(f"Need at least {k} profiles to build {k} clusters, got {n}")
+
+    rng = np.random.default_rng(seed)
+
+    # k-means++: pick each new centroid with probability proportional to
+    # its squared distance from the nearest existing one
+    centroids = np.asarray(X[[rng.integers(n)]], dtype=np.float32)
+    for _ in range(1, k):
+        _, distances = assign_clusters(X, centroids, block_size)
+        weights = distances.astype(np.float64)
+        total = weights.sum()
+        choice = rng.choice(n, p=weights / total) if total > 0 else rng.integers(n)
+        centroids = np.vstack([centroids, X[[choice]]])
+
+    labels = np.full(n, -1, dtype=np.int32)
+    for _ in range(n_iter):
+        new_labels, _ = assign_clusters(X, centroids, block_size)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        # centroid update: per-cluster sums as one-hot matrix products
+        sums = np.zeros(centroids.shape)
+        one_hot = np.eye(k, dtype=np.float32)
+        for start in range(0, n, block_size):
+            block = slice(start, start + block_size)
+            sums += one_hot[labels[block]].T @ np.asarray(X[block], dtype=np.float32)
+        counts = np.bincount(labels, minlength=k)
+
+        # empty clusters keep their previous centroid
+        filled = counts > 0
+        centroids[filled] = (sums[filled] / counts[filled, None]).astype(np.float32)
+
+    return centroids, labels
+
+
+def fit_profile_model(index, matrix, k=8, seed=0):
+    """
+    Cluster profiles and record the optimal plan distribution per cluster.
+
+    Only profiles with at least MIN_DAYS_FOR_RECOMMENDATION days are used,
+    so the plan distribution reflects reliable recommendations.
+
+    Args:
+        index: DataFrame with identifier, num_days and optimal_plan
+        matrix: (rows, 168) profile matrix, may be memory-mapped
+        k: Number of clusters (reduced if there are fewer reliable profiles)
+        seed: Random seed
+
+    Returns:
+        dict: {
+            'centroids': (k, 168),
+            'plan_distribution': (k, 3) share of each plan per cluster,
+            'counts': (k,) profiles per cluster,
+            'plans': PLAN_NAMES
+        }
+    """
+    reliable = (index['num_days'] >= MIN_DAYS_FOR_RECOMMENDATION).to_numpy()
+    X = np.asarray(matrix[reliable]) if not reliable.all() else matrix
+    if len(X) == 0:
+        raise ValueError(f"No profiles with at least {MIN_DAYS_FOR_RECOMMENDATION} days of data")
+    k = min(k, len(X))
+
+    centroids, labels = kmeans(X, k, seed=seed)
+
+    plan_codes = index.loc[reliable, 'optimal_plan'].map({p: i for i, p in enumerate(PLAN_NAMES)}).to_numpy()
+    counts_by_plan = np.bincount(labels * len(PLAN_NAMES) + plan_codes, minlength=k * len(PLAN_NAMES))
+    counts_by_plan = counts_by_plan.reshape(k, len(PLAN_NAMES))
+    counts = counts_by_plan.sum(axis=1)
+
+    with np.errstate(invalid='ignore'):
+        distribution = np.nan_to_num(counts_by_plan / counts[:, None])
+
+    return {
+        'centroids': centroids,
+        'plan_distribution': distribution,
+        'counts': counts,
+        'plans': PLAN_NAMES
+    }
+
+
+def save_profile_model(model, profile_dir=PROFILE_DIR):
+    """
+    Save a profile model as clusters.npz.
+
+    Args:
+        model: dict from fit_profile_model
+        profile_dir: Output directory
+
+    Returns:
+        str: Path to saved model
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+
+    output_path = os.path.join(profile_dir, 'clusters.npz')
+    np.savez(
+        output_path,
+        centroids=model['centroids'],
+        plan_distribution=model['plan_distribution'],
+        counts=model['counts'],
+        plans=np.array(model['plans'])
+    )
+
+    return output_path
+
+
+def load_profile_model(profile_dir=PROFILE_DIR):
+    """
+    Load a saved profile model.
+
+    Args:
+        profile_dir: Directory written by save_profile_model
+
+    Returns:
+        dict: Model as returned by fit_profile_model, or None if no model
+        has been saved
+    """
+    model_path = os.path.join(profile_dir, 'clusters.npz')
+    if not os.path.exists(model_path):
+        return None
+
+    with np.load(model_path) as data:
+        return {
+            'centroids': data['centroids'],
+            'plan_distribution': data['plan_distribution'],
+            'counts': data['counts'],
+            'plans': tuple(str(plan) for plan in data['plans'])
+        }
+
+
+def cluster_plan(profile, model):
+    """
+    Look up the plan most often optimal in a profile's cluster.
+
+    Args:
+        profile: 168-value profile
+        model: dict from fit_profile_model
+
+    Returns:
+        tuple: (plan name or None if the cluster is empty, cluster index,
+        {plan: share})
+    """
+    labels, _ = assign_clusters(np.asarray(profile, dtype=np.float32)[None, :], model['centroids'])
+    cluster = int(labels[0])
+
+    distribution = model['plan_distribution'][cluster]
+    shares = dict(zip(model['plans'], distribution.tolist()))
+    plan = model['plans'][int(distribution.argmax())] if model['counts'][cluster] else None
+
+    return plan, cluster, shares
+
+
+def nearest_profiles(profile, matrix, n=5, block_size=BLOCK_SIZE):
+    """
+    Find the profiles closest to a given one.
+
+    Scans the (possibly memory-mapped) matrix in blocks, keeping only the
+    best candidates from each block.
+
+    Args:
+        profile: 168-value profile
+        matrix: (rows, 168) profile matrix
+        n: Number of neighbours to return
+        block_size: Rows processed at once
+
+    Returns:
+        tuple: (row indices, Euclidean distances), nearest first
+    """
+    query = np.asarray(profile, dtype=np.float32)[None, :]
+
+    best_rows = np.empty(0, dtype=np.int64)
+    best_distances = np.empty(0, dtype=np.float32)
+    for start in range(0, len(matrix), block_size):
+        distances = _squared_distances(matrix[start:start + block_size], query)[:, 0]
+        keep = min(n, len(distances))
+        candidates = np.argpartition(distances, keep - 1)[:keep]
+
+        best_rows = np.concatenate([best_rows, candidates + start])
+        best_distances = np.concatenate([best_distances, distances[candidates]])
+
+    order = np.argsort(best_distances, kind='stable')[:n]
+
+    return best_rows[order], np.sqrt(best_distances[order])
+
+
+def main():
+    """Build the profile matrix and cluster model."""
+    parser = argparse.ArgumentParser(
+        description='Build hour-of-week load profiles and cluster them'
+    )
+    parser.add_argument(
+        'identifiers',
+        nargs='*',
+        help='Dataset identifiers (default: every folder under ./data)'
+    )
+    parser.add_argument(
+        '--fleet',
+        help='Build profiles from a fleet CSV (./data/<fleet>.csv) instead'
+    )
+    parser.add_argument(
+        '--clusters',
+        type=int,
+        default=8,
+        help='Number of clusters (default: 8)'
+    )
+
+    args = parser.parse_args()
+
+    if args.fleet:
+        from fleet_analyzer import load_fleet_data
+        index, matrix = profiles_for_fleet(load_fleet_data(f"./data/{args.fleet}.csv"))
+    else:
+        identifiers = args.identifiers or sorted(
+            name for name in os.listdir('./data') if os.path.isdir(os.path.join('./data', name))
+        )
+        index, matrix = profiles_for_identifiers(identifiers)
+
+    matrix_path = save_profiles(index, matrix)
+    print(f"✓ Saved {len(index)} profiles: {matrix_path}")
+
+    model = fit_profile_model(index, load_profiles()[1], k=args.clusters)
+    model_path = save_profile_model(model)
+    print(f"✓ Saved {len(model['centroids'])} clusters: {model_path}")
+
+    for cluster, (count, shares) in enumerate(zip(model['counts'], model['plan_distribution'])):
+        mix = ', '.join(f"{plan} {share * 100:.0f}%" for plan, share in zip(PLAN_NAMES, shares))
+        print(f"  cluster {cluster}: {count} profiles ({mix})")
+
+
+if __name__ == '__main__':
+    main()
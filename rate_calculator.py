@@ -1,5 +1,6 @@
 """Calculate costs for different rate plans."""
 
+import numpy as np
 from rate_plans import TIERED_RATES, TOU_RATES, ULO_RATES
 
 
@@ -38,6 +39,26 @@ def calculate_tiered_cost(analysis):
     }
 
 
+def calculate_tiered_costs(monthly_kwh, rates=TIERED_RATES):
+    """
+    Calculate tiered costs for many monthly consumptions at once.
+
+    Vectorized equivalent of calculate_tiered_cost's total. Rates may be
+    arrays that broadcast against monthly_kwh (e.g., a grid of prices).
+
+    Args:
+        monthly_kwh: Array-like or Series of monthly kWh
+        rates: dict with tier1_limit, tier1_rate and tier2_rate
+
+    Returns:
+        Monthly costs, same shape as monthly_kwh broadcast with rates
+    """
+    tier1_kwh = np.minimum(monthly_kwh, rates['tier1_limit'])
+    tier2_kwh = np.maximum(monthly_kwh - rates['tier1_limit'], 0)
+
+    return tier1_kwh * rates['tier1_rate'] + tier2_kwh * rates['tier2_rate']
+
+
 def calculate_tou_cost(analysis):
     """
     Calculate cost under TOU rate plan.
@@ -146,16 +167,31 @@ def calculate_all_plans(df, analysis):
     }
 
 
-def determine_optimal_plan(results):
+def determine_optimal_plan(results, analysis=None, profile=None, profile_model=None):
     """
     Determine which plan has the lowest cost.
 
+    When the dataset covers too few days for a reliable estimate and a
+    profile model is given, falls back on the plan most often optimal for
+    customers with a similar hour-of-week profile.
+
     Args:
         results: Dictionary with results for each plan
+        analysis: Dictionary with usage statistics (optional)
+        profile: Hour-of-week profile of the dataset (optional)
+        profile_model: Cluster model from profile_clustering (optional)
 
     Returns:
         str: Name of optimal plan
     """
+    if analysis is not None and profile is not None and profile_model is not None:
+        from profile_clustering import MIN_DAYS_FOR_RECOMMENDATION, cluster_plan
+
+        if analysis['num_days'] < MIN_DAYS_FOR_RECOMMENDATION:
+            plan, _, _ = cluster_plan(profile, profile_model)
+            if plan:
+                return plan
+
     costs = {
         'Tiered': results['tiered']['total_cost'],
         'TOU': results['tou']['total_cost'],
@@ -1,5 +1,7 @@
 """Rate plan definitions and pricing rules for Alectra Utilities."""
 
+import numpy as np
+
 # rate structures
 TIERED_RATES = {
     'tier1_limit': 1000,  # kWh per month
@@ -20,6 +22,13 @@ ULO_RATES = {
     'on_peak': 0.391     # $/kWh (4-9PM weekdays)
 }
 
+# plan names, in the order used by vectorized calculations
+PLAN_NAMES = ('Tiered', 'TOU', 'ULO')
+
+# pricing period order used by vectorized calculations
+TOU_PERIODS = ('off_peak', 'mid_peak', 'on_peak')
+ULO_PERIODS = ('ultra_low', 'off_peak', 'mid_peak', 'on_peak')
+
 
 def get_tou_period(hour, day_of_week):
     """
@@ -73,3 +82,53 @@ def get_ulo_period(hour, day_of_week):
         return "mid_peak"
     else:
         return "off_peak"
+
+
+def classify_tou_periods(hours, days_of_week):
+    """
+    Classify many hours into TOU pricing periods at once.
+
+    Vectorized equivalent of get_tou_period.
+
+    Args:
+        hours: Array-like of hours of day (0-23)
+        days_of_week: Array-like of days of week (0=Monday, 6=Sunday)
+
+    Returns:
+        ndarray: Period names, one per input hour
+    """
+    hours = np.asarray(hours)
+    is_weekday = np.asarray(days_of_week) < 5
+
+    on_peak = is_weekday & (((hours >= 7) & (hours < 11)) | ((hours >= 17) & (hours < 19)))
+    mid_peak = is_weekday & (hours >= 11) & (hours < 17)
+
+    return np.select([on_peak, mid_peak], ['on_peak', 'mid_peak'], default='off_peak').astype(object)
+
+
+def classify_ulo_periods(hours, days_of_week):
+    """
+    Classify many hours into ULO pricing periods at once.
+
+    Vectorized equivalent of get_ulo_period.
+
+    Args:
+        hours: Array-like of hours of day (0-23)
+        days_of_week: Array-like of days of week (0=Monday, 6=Sunday)
+
+    Returns:
+        ndarray: Period names, one per input hour
+    """
+    hours = np.asarray(hours)
+    is_weekday = np.asarray(days_of_week) < 5
+
+    # conditions are checked in the same order as get_ulo_period
+    ultra_low = (hours >= 23) | (hours < 7)
+    on_peak = is_weekday & (hours >= 16) & (hours < 21)
+    mid_peak = is_weekday & (hours >= 11) & (hours < 17)
+
+    return np.select(
+        [ultra_low, on_peak, mid_peak],
+        ['ultra_low', 'on_peak', 'mid_peak'],
+        default='off_peak'
+    ).astype(object)
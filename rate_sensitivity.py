@@ -0,0 +1,233 @@
+"""Sweep rate plan prices and find where plan recommendations flip."""
+
+import numpy as np
+from rate_plans import PLAN_NAMES, TIERED_RATES, TOU_RATES, ULO_RATES, TOU_PERIODS, ULO_PERIODS
+from rate_calculator import calculate_tiered_costs
+
+
+RATE_TABLES = {
+    'tiered': TIERED_RATES,
+    'tou': TOU_RATES,
+    'ulo': ULO_RATES
+}
+
+
+def parse_rate_param(param):
+    """
+    Split a rate parameter name into plan and rate key.
+
+    Args:
+        param: Parameter name such as "ulo.on_peak" or "tiered.tier1_limit"
+
+    Returns:
+        tuple: (plan, key)
+    """
+    plan, _, key = param.partition('.')
+    if plan not in RATE_TABLES or key not in RATE_TABLES[plan]:
+        valid = ', '.join(f'{p}.{k}' for p, rates in RATE_TABLES.items() for k in rates)
+        raise ValueError(f"Unknown rate parameter: {param} (expected one of {valid})")
+    return plan, key
+
+
+def period_kwh_matrix(usage):
+    """
+    Build monthly-projected kWh per pricing period for one or many customers.
+
+    Args:
+        usage: Usage statistics dict (from analyze_patterns) or fleet
+            statistics DataFrame (from fleet_analyzer.analyze_fleet)
+
+    Returns:
+        dict: index (customer labels), monthly_kwh (n,), tou (n, 3) and
+        ulo (n, 4) with columns in TOU_PERIODS / ULO_PERIODS order
+    """
+    if isinstance(usage, dict):
+        multiplier = 30 / usage['num_days']
+        return {
+            'index': np.array([0]),
+            'monthly_kwh': np.array([usage['monthly_kwh_projected']], dtype=float),
+            'tou': np.array([[usage['tou_breakdown'].get(p, 0) * multiplier for p in TOU_PERIODS]]),
+            'ulo': np.array([[usage['ulo_breakdown'].get(p, 0) * multiplier for p in ULO_PERIODS]])
+        }
+
+    multiplier = (30 / usage['num_days']).to_numpy()[:, None]
+    return {
+        'index': usage.index.to_numpy(),
+        'monthly_kwh': usage['monthly_kwh_projected'].to_numpy(dtype=float),
+        'tou': usage[[f'tou_{p}_kwh' for p in TOU_PERIODS]].to_numpy(dtype=float) * multiplier,
+        'ulo': usage[[f'ulo_{p}_kwh' for p in ULO_PERIODS]].to_numpy(dtype=float) * multiplier
+    }
+
+
+def rate_grid(x_param, x_values, y_param=None, y_values=None):
+    """
+    Expand one or two swept rate parameters into per-grid-point rates.
+
+    Args:
+        x_param: First swept parameter (e.g., "ulo.on_peak")
+        x_values: Values for the first parameter
+        y_param: Second swept parameter (optional)
+        y_values: Values for the second parameter (optional)
+
+    Returns:
+        dict: plan -> {rate key -> array of length nx * ny}, grid points
+        in row-major (x, y) order
+
+    Raises:
+        ValueError: If both axes sweep the same parameter
+    """
+    if y_param is not None and parse_rate_param(x_param) == parse_rate_param(y_param):
+        raise ValueError(f"Cannot sweep {x_param} on both axes")
+
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values if y_param else [np.nan], dtype=float)
+    grid_x, grid_y = np.meshgrid(x_values, y_values, indexing='ij')
+    size = grid_x.size
+
+    rates = {
+        plan: {key: np.full(size, float(value)) for key, value in table.items()}
+        for plan, table in RATE_TABLES.items()
+    }
+
+    for param, values in [(x_param, grid_x), (y_param, grid_y)]:
+        if param is None:
+            continue
+        plan, key = parse_rate_param(param)
+        rates[plan][key] = values.ravel()
+
+    return rates
+
+
+def grid_costs(kwh, rates):
+    """
+    Calculate monthly cost of every plan at every grid point.
+
+    TOU and ULO costs are a single matrix product of period kWh with the
+    period price grid; tiered costs are broadcast over the grid.
+
+    Args:
+        kwh: dict from period_kwh_matrix (or a slice of one)
+        rates: dict from rate_grid
+
+    Returns:
+        ndarray: Costs with shape (customers, 3, grid points), plans in
+        PLAN_NAMES order
+    """
+    tou_prices = np.vstack([rates['tou'][p] for p in TOU_PERIODS])
+    ulo_prices = np.vstack([rates['ulo'][p] for p in ULO_PERIODS])
+
+    tiered = calculate_tiered_costs(kwh['monthly_kwh'][:, None], rates['tiered'])
+
+    return np.stack([tiered, kwh['tou'] @ tou_prices, kwh['ulo'] @ ulo_prices], axis=1)
+
+
+def _breakeven(costs, optimal, x_values):
+    """
+    Find where the optimal plan first changes along the x axis.
+
+    The crossing is linearly interpolated between the two grid points
+    either side of the flip, which is exact for price parameters since
+    costs are linear in price.
+
+    Args:
+        costs: Costs with shape (customers, 3, nx, ny)
+        optimal: Optimal plan index with shape (customers, nx, ny)
+        x_values: Values of the x parameter
+
+    Returns:
+        ndarray: Breakeven x value with shape (customers, ny), NaN where
+        the recommendation never changes
+    """
+    n, nx, ny = optimal.shape
+    if nx < 2:
+        return np.full((n, ny), np.nan)
+
+    first = optimal[:, 0, :]
+    changed = optimal != first[:, None, :]
+    flips = changed.any(axis=1)
+    after = changed.argmax(axis=1)
+    before = np.maximum(after - 1, 0)
+    new = np.take_along_axis(optimal, after[:, None, :], axis=1)[:, 0, :]
+
+    rows = np.arange(n)[:, None]
+    cols = np.arange(ny)[None, :]
+    margin_before = costs[rows, first, before, cols] - costs[rows, new, before, cols]
+    margin_after = costs[rows, first, after, cols] - costs[rows, new, after, cols]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = margin_before / (margin_before - margin_after)
+    fraction = np.clip(np.nan_to_num(fraction), 0, 1)
+
+    breakeven = x_values[before] + fraction * (x_values[after] - x_values[before])
+
+    return np.where(flips, breakeven, np.nan)
+
+
+def sweep_rates(usage, x_param, x_values, y_param=None, y_values=None,
+                block_size=256, return_costs=False):
+    """
+    Sweep one or two rate parameters and find recommendation breakevens.
+
+    Args:
+        usage: Usage statistics dict or fleet statistics DataFrame
+        x_param: First swept parameter (e.g., "ulo.on_peak")
+        x_values: Values for the first parameter
+        y_param: Second swept parameter (optional, e.g., "tiered.tier1_limit")
+        y_values: Values for the second parameter (optional)
+        block_size: Customers priced per block, bounding memory use
+        return_costs: Include the full cost grid in the result
+
+    Returns:
+        dict: {
+            'index': customer labels,
+            'plans': PLAN_NAMES,
+            'x_param', 'x_values', 'y_param', 'y_values',
+            'optimal': plan index per customer and grid point,
+                shape (customers, nx) or (customers, nx, ny),
+            'breakeven': x value where the recommendation first flips,
+                shape (customers,) or (customers, ny), NaN if it never does,
+            'costs': shape (customers, 3, nx[, ny]), if return_costs
+        }
+    """
+    if (y_param is None) != (y_values is None):
+        raise ValueError("y_param and y_values must be given together")
+
+    x_values = np.asarray(x_values, dtype=float)
+    nx = len(x_values)
+    ny = len(y_values) if y_param else 1
+
+    kwh = period_kwh_matrix(usage)
+    rates = rate_grid(x_param, x_values, y_param, y_values)
+    n = len(kwh['monthly_kwh'])
+
+    optimal = np.empty((n, nx, ny), dtype=np.int8)
+    breakeven = np.empty((n, ny))
+    costs = np.empty((n, len(PLAN_NAMES), nx, ny)) if return_costs else None
+
+    for start in range(0, n, block_size):
+        block = slice(start, start + block_size)
+        block_kwh = {key: values[block] for key, values in kwh.items()}
+
+        block_costs = grid_costs(block_kwh, rates).reshape(-1, len(PLAN_NAMES), nx, ny)
+        # ties resolve to the first plan, as in determine_optimal_plan
+        block_optimal = block_costs.argmin(axis=1)
+
+        optimal[block] = block_optimal
+        breakeven[block] = _breakeven(block_costs, block_optimal, x_values)
+        if return_costs:
+            costs[block] = block_costs
+
+    result = {
+        'index': kwh['index'],
+        'plans': PLAN_NAMES,
+        'x_param': x_param,
+        'x_values': x_values,
+        'y_param': y_param,
+        'y_values': np.asarray(y_values, dtype=float) if y_param else None,
+        'optimal': optimal if y_param else optimal[:, :, 0],
+        'breakeven': breakeven if y_param else breakeven[:, 0]
+    }
+    if return_costs:
+        result['costs'] = costs if y_param else costs[..., 0]
+
+    return result
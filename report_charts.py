@@ -0,0 +1,293 @@
+"""Render lightweight inline SVG charts for the HTML report."""
+
+from html import escape
+import numpy as np
+import pandas as pd
+from rate_plans import TOU_RATES, ULO_RATES, TOU_PERIODS, ULO_PERIODS
+
+
+# per-chart limits that keep reports small for very long histories
+MAX_CHART_POINTS = 120
+CHART_BYTE_BUDGET = 16 * 1024
+
+CHART_WIDTH = 640
+CHART_HEIGHT = 240
+MARGIN = {'top': 20, 'right': 20, 'bottom': 40, 'left': 55}
+
+PLAN_COLORS = {'Tiered': '#7f8c8d', 'TOU': '#3498db', 'ULO': '#4caf50'}
+PERIOD_COLORS = {
+    'ultra_low': '#2e7d32',
+    'off_peak': '#4caf50',
+    'mid_peak': '#ffc107',
+    'on_peak': '#c62828'
+}
+
+
+def daily_plan_costs(daily, results):
+    """
+    Price daily period kWh under every plan.
+
+    Tiered is priced at the plan's effective monthly rate, since tier
+    limits apply to the month rather than the day.
+
+    Args:
+        daily: DataFrame from usage_analyzer.daily_period_kwh
+        results: Cost results for all plans
+
+    Returns:
+        DataFrame indexed by date with one cost column per plan
+    """
+    tou_kwh = daily[[f'tou_{p}' for p in TOU_PERIODS]].to_numpy()
+    ulo_kwh = daily[[f'ulo_{p}' for p in ULO_PERIODS]].to_numpy()
+
+    tiered = results['tiered']
+    tiered_rate = tiered['total_cost'] / tiered['monthly_kwh'] if tiered['monthly_kwh'] else 0
+
+    return pd.DataFrame({
+        'Tiered': tou_kwh.sum(axis=1) * tiered_rate,
+        'TOU': tou_kwh @ [TOU_RATES[p] for p in TOU_PERIODS],
+        'ULO': ulo_kwh @ [ULO_RATES[p] for p in ULO_PERIODS]
+    }, index=daily.index)
+
+
+def downsample(values, max_points):
+    """
+    Average consecutive rows into at most max_points buckets.
+
+    Args:
+        values: 1-D or 2-D array, rows are points
+        max_points: Maximum number of rows to return
+
+    Returns:
+        tuple: (averaged values, index of the first row in each bucket)
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n <= max_points:
+        return values, np.arange(n)
+
+    starts = np.linspace(0, n, max_points, endpoint=False).astype(int)
+    sizes = np.diff(np.append(starts, n))
+    sums = np.add.reduceat(values, starts, axis=0)
+    if values.ndim > 1:
+        sizes = sizes[:, None]
+
+    return sums / sizes, starts
+
+
+def _frame(y_max, x_labels, y_label):
+    """Render axes, gridlines and labels shared by all charts."""
+    left, top = MARGIN['left'], MARGIN['top']
+    plot_w = CHART_WIDTH - MARGIN['left'] - MARGIN['right']
+    plot_h = CHART_HEIGHT - MARGIN['top'] - MARGIN['bottom']
+    bottom = top + plot_h
+
+    parts = []
+    for i in range(5):
+        y = bottom - plot_h * i / 4
+        parts.append(f'<line x1="{left}" y1="{y:.1f}" x2="{left + plot_w}" y2="{y:.1f}" stroke="#eee"/>')
+        parts.append(f'<text x="{left - 6}" y="{y + 4:.1f}" text-anchor="end">{y_max * i / 4:.2f}</text>')
+
+    for x, label in x_labels:
+        parts.append(f'<text x="{left + x * plot_w:.1f}" y="{bottom + 16}" text-anchor="middle">{escape(str(label))}</text>')
+
+    parts.append(f'<text x="12" y="{top + plot_h / 2:.1f}" transform="rotate(-90 12 {top + plot_h / 2:.1f})" text-anchor="middle">{escape(y_label)}</text>')
+    parts.append(f'<line x1="{left}" y1="{bottom}" x2="{left + plot_w}" y2="{bottom}" stroke="#999"/>')
+
+    return parts
+
+
+def _legend(items):
+    """Render a single-row legend for (name, color) pairs."""
+    parts = []
+    x = MARGIN['left']
+    y = CHART_HEIGHT - 8
+    for name, color in items:
+        parts.append(f'<rect x="{x}" y="{y - 9}" width="10" height="10" fill="{color}"/>')
+        parts.append(f'<text x="{x + 14}" y="{y}">{escape(name)}</text>')
+        x += 24 + 7 * len(name)
+    return parts
+
+
+def _svg(parts, title):
+    """Wrap chart elements in an svg root element."""
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {CHART_WIDTH} {CHART_HEIGHT}" '
+        f'role="img" aria-label="{escape(title)}" font-size="11" font-family="sans-serif" fill="#333">'
+        + ''.join(parts) + '</svg>'
+    )
+
+
+def line_chart_svg(series, x_labels, y_label, title):
+    """
+    Render one or more series as an SVG line chart.
+
+    Args:
+        series: dict of name -> (values array, color), all the same length
+        x_labels: (fraction along x axis, label) pairs
+        y_label: Y axis label
+        title: Accessible chart title
+
+    Returns:
+        str: SVG markup
+    """
+    plot_w = CHART_WIDTH - MARGIN['left'] - MARGIN['right']
+    plot_h = CHART_HEIGHT - MARGIN['top'] - MARGIN['bottom']
+    bottom = MARGIN['top'] + plot_h
+
+    # scale to the largest finite value; series with no readings are not drawn
+    finite = np.concatenate([np.asarray(values, dtype=float).ravel() for values, _ in series.values()] or [[]])
+    finite = finite[np.isfinite(finite)]
+    y_max = finite.max() if len(finite) else 0
+    y_max = y_max or 1
+
+    parts = _frame(y_max, x_labels, y_label)
+    drawn = []
+    for name, (values, color) in series.items():
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        if n == 0 or np.isnan(values).all():
+            continue
+        drawn.append((name, color))
+        values = np.nan_to_num(values)
+        xs = MARGIN['left'] + np.arange(n) * (plot_w / max(n - 1, 1))
+        ys = bottom - values / y_max * plot_h
+        points = ' '.join(f'{x:.1f},{y:.1f}' for x, y in zip(xs, ys))
+        parts.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2"/>')
+
+    parts += _legend(drawn)
+
+    return _svg(parts, title)
+
+
+def hourly_profile_chart(analysis):
+    """
+    Render average weekday and weekend consumption by hour.
+
+    Args:
+        analysis: Usage statistics
+
+    Returns:
+        str: SVG markup
+    """
+    hours = np.arange(24)
+    weekday = np.array([analysis['weekday_hourly'].get(h, np.nan) for h in hours])
+    weekend = np.array([analysis['weekend_hourly'].get(h, np.nan) for h in hours])
+
+    x_labels = [(h / 23, f'{h:02d}:00') for h in range(0, 24, 3)]
+    series = {
+        'Weekday': (weekday, '#3498db'),
+        'Weekend': (weekend, '#e67e22')
+    }
+
+    return line_chart_svg(series, x_labels, 'avg kWh', 'Average hourly consumption')
+
+
+def daily_cost_chart(daily_costs, max_points=MAX_CHART_POINTS):
+    """
+    Render daily cost under each plan, averaged into at most max_points.
+
+    Args:
+        daily_costs: DataFrame from daily_plan_costs
+        max_points: Maximum number of points per line
+
+    Returns:
+        str: SVG markup
+    """
+    values, starts = downsample(daily_costs.to_numpy(), max_points)
+    n = len(values)
+    dates = daily_costs.index[starts]
+
+    # include the year once the history spans more than one
+    date_format = '%b %d' if (daily_costs.index[-1] - daily_costs.index[0]).days < 365 else '%b %Y'
+    ticks = np.unique(np.linspace(0, n - 1, min(n, 6)).astype(int))
+    x_labels = [(i / max(n - 1, 1), dates[i].strftime(date_format)) for i in ticks]
+
+    series = {
+        plan: (values[:, i], PLAN_COLORS[plan])
+        for i, plan in enumerate(daily_costs.columns)
+    }
+
+    return line_chart_svg(series, x_labels, '$/day', 'Daily cost by plan')
+
+
+def period_share_chart(analysis):
+    """
+    Render the share of consumption in each pricing period for TOU and ULO.
+
+    Args:
+        analysis: Usage statistics
+
+    Returns:
+        str: SVG markup
+    """
+    plot_w = CHART_WIDTH - MARGIN['left'] - MARGIN['right']
+    total = analysis['total_kwh'] or 1
+    rows = [
+        ('TOU', analysis['tou_breakdown'], TOU_PERIODS),
+        ('ULO', analysis['ulo_breakdown'], ULO_PERIODS)
+    ]
+
+    parts = []
+    for row, (label, breakdown, periods) in enumerate(rows):
+        y = MARGIN['top'] + 20 + row * 70
+        x = MARGIN['left']
+        parts.append(f'<text x="{x - 6}" y="{y + 24}" text-anchor="end">{label}</text>')
+        for period in periods:
+            share = breakdown.get(period, 0) / total
+            width = share * plot_w
+            if width <= 0:
+                continue
+            parts.append(f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="40" fill="{PERIOD_COLORS[period]}"/>')
+            if share >= 0.06:
+                parts.append(f'<text x="{x + width / 2:.1f}" y="{y + 24}" text-anchor="middle" fill="#fff">{share * 100:.0f}%</text>')
+            x += width
+
+    parts += _legend([(p.replace('_', '-'), PERIOD_COLORS[p]) for p in ULO_PERIODS])
+
+    return _svg(parts, 'Consumption share by pricing period')
+
+
+def _fits(svg, byte_budget):
+    """Return the chart if it fits the budget, otherwise an empty string."""
+    return svg if len(svg.encode('utf-8')) <= byte_budget else ''
+
+
+def _within_budget(render, byte_budget, max_points=MAX_CHART_POINTS):
+    """Render a downsampled chart, halving its resolution until it fits the budget."""
+    while True:
+        svg = render(max_points)
+        if _fits(svg, byte_budget) or max_points <= 8:
+            return _fits(svg, byte_budget)
+        max_points //= 2
+
+
+def build_report_charts(analysis, results, daily=None, byte_budget=CHART_BYTE_BUDGET):
+    """
+    Build all report charts from pre-aggregated data.
+
+    Args:
+        analysis: Usage statistics
+        results: Cost results for all plans
+        daily: DataFrame from usage_analyzer.daily_period_kwh (optional)
+        byte_budget: Maximum size of each chart in bytes; charts that
+            cannot fit are left out
+
+    Returns:
+        dict: Chart name -> SVG markup (empty string if omitted)
+    """
+    charts = {
+        # fixed-size charts have nothing to downsample
+        'hourly_profile': _fits(hourly_profile_chart(analysis), byte_budget),
+        'period_share': _fits(period_share_chart(analysis), byte_budget),
+        'daily_cost': ''
+    }
+
+    if daily is not None and len(daily):
+        daily_costs = daily_plan_costs(daily, results)
+        charts['daily_cost'] = _within_budget(
+            lambda points: daily_cost_chart(daily_costs, points),
+            byte_budget
+        )
+
+    return charts
@@ -2,10 +2,36 @@
 
 import os
 from datetime import datetime
+from functools import lru_cache
 from jinja2 import Template
+from usage_analyzer import daily_period_kwh
+from report_charts import build_report_charts
 
 
-def generate_insights(analysis, results, optimal_plan, validation=None):
+TEMPLATE_PATH = './templates/report_template.html'
+
+
+@lru_cache(maxsize=4)
+def _compile_template(template_path, mtime):
+    """Compile a template once per path and modification time."""
+    with open(template_path, 'r') as f:
+        return Template(f.read())
+
+
+def load_template(template_path=TEMPLATE_PATH):
+    """
+    Load the compiled report template, reusing it until the file changes.
+
+    Args:
+        template_path: Path to the Jinja2 template
+
+    Returns:
+        Template: Compiled template
+    """
+    return _compile_template(template_path, os.path.getmtime(template_path))
+
+
+def generate_insights(analysis, results, optimal_plan, validation=None, quality=None):
     """
     Generate insights based on usage patterns.
 
@@ -14,6 +40,7 @@ def generate_insights(analysis, results, optimal_plan, validation=None):
         results: Cost results for all plans
         optimal_plan: Name of optimal plan
         validation: Cost validation results (optional)
+        quality: Data quality results (optional)
 
     Returns:
         str: HTML formatted insights
@@ -61,8 +88,12 @@ def generate_insights(analysis, results, optimal_plan, validation=None):
         'ULO': results['ulo']['total_cost']
     }
     sorted_costs = sorted(costs.items(), key=lambda x: x[1])
+    lowest_plan = sorted_costs[0][0]
 
-    if sorted_costs[1][1] - sorted_costs[0][1] < 5:
+    if optimal_plan != lowest_plan:
+        # recommendation came from the profile clusters, not this dataset's costs
+        insights.append(f"<li>With only {analysis['num_days']} days of data, {optimal_plan} is recommended because it is the best plan for most customers with a similar hourly usage profile. This period's costs alone favour {lowest_plan}, which is ${costs[optimal_plan] - costs[lowest_plan]:.2f}/month cheaper.</li>")
+    elif sorted_costs[1][1] - sorted_costs[0][1] < 5:
         insights.append(f"<li>The cost difference between {sorted_costs[0][0]} and {sorted_costs[1][0]} is minimal (${sorted_costs[1][1] - sorted_costs[0][1]:.2f}/month).</li>")
     else:
         insights.append(f"<li>Switching to {optimal_plan} provides clear cost savings of ${sorted_costs[-1][1] - sorted_costs[0][1]:.2f}/month compared to the most expensive option.</li>")
@@ -77,10 +108,18 @@ def generate_insights(analysis, results, optimal_plan, validation=None):
         else:
             insights.append(f"<li>Cost estimates show some deviation from actual billing data ({accuracy:.1f}% match). This may be due to additional fees or rate changes.</li>")
 
+    # data quality insights
+    if quality and quality['missing_hours']:
+        if quality['imputed_hours']:
+            insights.append(f"<li>{quality['imputed_hours']} missing hours ({100 - quality['coverage_pct']:.1f}% of the period) were filled with typical usage for the same hour of the week.</li>")
+        else:
+            insights.append(f"<li>Data covers {quality['coverage_pct']:.1f}% of the period; {quality['missing_hours']} missing hours may reduce the accuracy of projections.</li>")
+
     return '\n'.join(insights)
 
 
-def generate_report(analysis, results, identifier, enriched_df, validation=None):
+def generate_report(analysis, results, identifier, enriched_df, validation=None, daily=None, quality=None,
+                    optimal_plan=None):
     """
     Generate HTML report.
 
@@ -88,15 +127,21 @@ def generate_report(analysis, results, identifier, enriched_df, validation=None)
         analysis: Usage statistics
         results: Cost results for all plans
         identifier: Dataset identifier
-        enriched_df: DataFrame with time metadata
+        enriched_df: DataFrame with time metadata, or None when the analysis
+            carries start_datetime/end_datetime (chunked pipeline)
         validation: Cost validation results (optional)
+        daily: Daily kWh per pricing period (optional, derived from
+            enriched_df when not given)
+        quality: Data quality results (optional)
+        optimal_plan: Recommended plan (optional, lowest cost when not given)
 
     Returns:
         str: Path to generated report
     """
     # determine optimal plan
-    from rate_calculator import determine_optimal_plan
-    optimal_plan = determine_optimal_plan(results)
+    if optimal_plan is None:
+        from rate_calculator import determine_optimal_plan
+        optimal_plan = determine_optimal_plan(results)
 
     # calculate savings
     costs = {
@@ -104,23 +149,29 @@ def generate_report(analysis, results, identifier, enriched_df, validation=None)
         'TOU': results['tou']['total_cost'],
         'ULO': results['ulo']['total_cost']
     }
-    min_cost = min(costs.values())
     max_cost = max(costs.values())
-    savings = max_cost - min_cost
+    savings = max_cost - costs[optimal_plan]
 
     # get date range
-    start_date = enriched_df['datetime'].min().strftime('%B %d, %Y')
-    end_date = enriched_df['datetime'].max().strftime('%B %d, %Y')
+    if enriched_df is not None:
+        start_datetime = enriched_df['datetime'].min()
+        end_datetime = enriched_df['datetime'].max()
+    else:
+        start_datetime = analysis['start_datetime']
+        end_datetime = analysis['end_datetime']
+    start_date = start_datetime.strftime('%B %d, %Y')
+    end_date = end_datetime.strftime('%B %d, %Y')
 
     # generate insights
-    insights = generate_insights(analysis, results, optimal_plan, validation)
+    insights = generate_insights(analysis, results, optimal_plan, validation, quality)
 
-    # load template
-    template_path = './templates/report_template.html'
-    with open(template_path, 'r') as f:
-        template_content = f.read()
+    # build charts from small pre-aggregated arrays
+    if daily is None and enriched_df is not None:
+        daily = daily_period_kwh(enriched_df)
+    charts = build_report_charts(analysis, results, daily)
 
-    template = Template(template_content)
+    # load template
+    template = load_template()
 
     # render report
     html_content = template.render(
@@ -133,6 +184,8 @@ def generate_report(analysis, results, identifier, enriched_df, validation=None)
         end_date=end_date,
         insights=insights,
         validation=validation,
+        charts=charts,
+        quality=quality,
         report_date=datetime.now().strftime('%B %d, %Y at %I:%M %p')
     )
 
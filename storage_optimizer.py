@@ -0,0 +1,298 @@
+"""Optimize battery and EV charging schedules for time-based rate plans."""
+
+import numpy as np
+import pandas as pd
+from rate_plans import TOU_RATES, ULO_RATES, classify_tou_periods, classify_ulo_periods
+from rate_calculator import calculate_tiered_costs
+
+
+TIME_BASED_PLANS = {
+    'tou': ('TOU', TOU_RATES, classify_tou_periods),
+    'ulo': ('ULO', ULO_RATES, classify_ulo_periods)
+}
+
+# battery state of charge is discretized into this many steps
+SOC_STEPS = 20
+
+# days optimized together, bounding memory of the dynamic program
+DAY_BLOCK_SIZE = 2048
+
+
+def daily_matrices(df):
+    """
+    Reshape hourly usage into one row of 24 hours per day.
+
+    Args:
+        df: DataFrame with datetime, kwh and hour columns, and optionally
+            meter_id for fleet data
+
+    Returns:
+        tuple: (load, keys) where load is a (days, 24) kWh array with
+        missing hours as zero, and keys is a DataFrame with meter_id (if
+        present) and date for each row
+    """
+    keys = ['meter_id', 'date'] if 'meter_id' in df.columns else ['date']
+    df = df.assign(date=df['datetime'].dt.normalize())
+
+    load = df.pivot_table(index=keys, columns='hour', values='kwh', aggfunc='sum')
+    load = load.reindex(columns=range(24)).fillna(0)
+
+    return load.to_numpy(dtype=float), load.index.to_frame(index=False)
+
+
+def price_matrix(dates, plan):
+    """
+    Build hourly prices for each day under a time-based plan.
+
+    Args:
+        dates: Series of dates, one per day row
+        plan: "tou" or "ulo"
+
+    Returns:
+        ndarray: (days, 24) $/kWh
+    """
+    _, rates, classify = TIME_BASED_PLANS[plan]
+
+    # prices depend only on the hour of week, so classify one week
+    periods = classify(np.tile(np.arange(24), 7), np.repeat(np.arange(7), 24))
+    week = pd.Series(periods).map(rates).to_numpy(dtype=float).reshape(7, 24)
+
+    return week[pd.DatetimeIndex(dates).dayofweek.to_numpy()]
+
+
+def optimize_battery_days(load, price, capacity_kwh, power_kw, efficiency=0.9, soc_steps=SOC_STEPS):
+    """
+    Find the cost-minimizing battery schedule for each day.
+
+    Runs a dynamic program over discretized state of charge, vectorized
+    across days and restricted to the state changes the power limit
+    allows each hour. The battery starts each day empty, charges from the
+    grid (losing 1 - efficiency of the energy drawn) and discharges only
+    into the home's own load, never exporting. A discharge step larger than the
+    hour's load is allowed with the excess forfeited, so the reported
+    costs are always achievable despite the discretization.
+
+    Args:
+        load: (days, 24) household kWh
+        price: (days, 24) $/kWh
+        capacity_kwh: Usable battery capacity
+        power_kw: Maximum charge or discharge per hour
+        efficiency: Round-trip efficiency, applied when charging
+        soc_steps: Number of state-of-charge steps
+
+    Returns:
+        tuple: (grid, soc) where grid is (days, 24) kWh drawn from the grid
+        and soc is (days, 25) kWh stored at the start of each hour and end
+        of the day (a lower bound where excess discharge was forfeited)
+
+    Raises:
+        ValueError: If capacity is not positive, power is negative or
+            efficiency is outside (0, 1]
+    """
+    if not capacity_kwh > 0:
+        raise ValueError(f"Battery capacity must be positive, got {capacity_kwh} kWh")
+    if not power_kw >= 0:
+        raise ValueError(f"Battery power must not be negative, got {power_kw} kW")
+    if not 0 < efficiency <= 1:
+        raise ValueError(f"Battery efficiency must be in (0, 1], got {efficiency}")
+
+    days = len(load)
+    step = capacity_kwh / soc_steps
+    levels = np.linspace(0, capacity_kwh, soc_steps + 1)
+    delta = levels[None, :] - levels[:, None]  # [from, to]
+    battery_grid = np.where(delta > 0, delta / efficiency, delta)
+
+    # only state changes within the power limit are reachable in one hour
+    max_up = min(int(np.floor(power_kw * efficiency / step + 1e-9)), soc_steps)
+    max_down = min(int(np.floor(power_kw / step + 1e-9)), soc_steps)
+    # descending, so ties resolve to the lowest starting state
+    offset_steps = np.arange(max_up, -max_down - 1, -1)
+    offset_kwh = np.where(offset_steps > 0, offset_steps * step / efficiency, offset_steps * step).astype(np.float32)
+
+    grid = np.empty((days, 24))
+    soc = np.empty((days, 25))
+
+    for start in range(0, days, DAY_BLOCK_SIZE):
+        block = slice(start, start + DAY_BLOCK_SIZE)
+        block_load = load[block].astype(np.float32).T
+        block_price = price[block].astype(np.float32).T
+        n = block_load.shape[1]
+
+        # cost[hour, offset, day]; no exporting, so the grid draw never goes below zero
+        cost = np.maximum(block_load[:, None, :] + offset_kwh[None, :, None], 0) * block_price[:, None, :]
+
+        # value[h, state, day]: cheapest cost of reaching state at the start
+        # of hour h; state-major so every pass runs over all days at once
+        value = np.full((25, soc_steps + 1, n), np.inf, dtype=np.float32)
+        value[0, 0] = 0
+        candidate = np.empty((soc_steps + 1, n), dtype=np.float32)
+
+        for hour in range(24):
+            # one pass per reachable offset: every state moves by d steps
+            for i, d in enumerate(offset_steps):
+                lo, hi = max(d, 0), soc_steps + 1 + min(d, 0)
+                rows = candidate[:hi - lo]
+                np.add(value[hour, lo - d:hi - d], cost[hour, i], out=rows)
+                np.minimum(rows, value[hour + 1, lo:hi], out=value[hour + 1, lo:hi])
+
+        # walk back from the cheapest end state, recovering each hour's
+        # move as the first offset that reproduces the optimal value
+        columns = np.arange(n)
+        states = np.empty((n, 25), dtype=np.intp)
+        states[:, 24] = value[24].argmin(axis=0)
+        for hour in range(23, -1, -1):
+            from_state = states[:, hour + 1] - offset_steps[:, None]
+            valid = (from_state >= 0) & (from_state <= soc_steps)
+            totals = value[hour, np.clip(from_state, 0, soc_steps), columns] + cost[hour]
+            states[:, hour] = from_state[np.where(valid, totals, np.inf).argmin(axis=0), columns]
+
+        grid[block] = np.maximum(block_load.T + battery_grid[states[:, :-1], states[:, 1:]], 0)
+        soc[block] = levels[states]
+
+    return grid, soc
+
+
+def _ev_window(plug_in_hour, plug_out_hour):
+    """Return hours the EV is plugged in and their order after plug-in."""
+    hours = np.arange(24)
+    since_plug_in = (hours - plug_in_hour) % 24
+    available = since_plug_in < (plug_out_hour - plug_in_hour) % 24
+    return available, since_plug_in
+
+
+def ev_charging_days(price, daily_kwh, power_kw, plug_in_hour=18, plug_out_hour=7, optimize=True):
+    """
+    Schedule EV charging for each day.
+
+    Optimized charging fills the cheapest plugged-in hours first (greedy
+    over sorted prices); unmanaged charging starts at plug-in and runs at
+    full power until done. Each calendar day must receive daily_kwh.
+
+    Args:
+        price: (days, 24) $/kWh
+        daily_kwh: Energy the EV needs each day
+        power_kw: Maximum charging power
+        plug_in_hour: Hour the EV is plugged in
+        plug_out_hour: Hour the EV is unplugged
+        optimize: Charge in the cheapest hours rather than at plug-in
+
+    Returns:
+        ndarray: (days, 24) kWh of EV charging
+
+    Raises:
+        ValueError: If daily_kwh or power_kw is negative, or daily_kwh
+            cannot be delivered while plugged in
+    """
+    if not (daily_kwh >= 0 and power_kw >= 0):
+        raise ValueError(f"EV energy and power must not be negative, got {daily_kwh} kWh and {power_kw} kW")
+
+    available, since_plug_in = _ev_window(plug_in_hour, plug_out_hour)
+    if daily_kwh > power_kw * available.sum() + 1e-9:
+        raise ValueError(
+            f"EV needs {daily_kwh} kWh/day but can only charge "
+            f"{power_kw * available.sum():.1f} kWh between {plug_in_hour}:00 and {plug_out_hour}:00"
+        )
+
+    if optimize:
+        # sort by price, breaking ties by time since plug-in
+        keys = np.where(available, price, np.inf) + since_plug_in * 1e-9
+        order = keys.argsort(axis=1, kind='stable')
+        rank = order.argsort(axis=1)
+    else:
+        rank = np.broadcast_to(since_plug_in, price.shape)
+
+    charge = np.clip(daily_kwh - rank * power_kw, 0, power_kw)
+
+    return np.where(available, charge, 0)
+
+
+def optimized_plan_costs(df, battery=None, ev=None):
+    """
+    Calculate baseline and optimized monthly costs for every meter.
+
+    Args:
+        df: DataFrame with time metadata (from add_time_metadata), with a
+            meter_id column for fleet data
+        battery: dict with capacity_kwh, power_kw and optional efficiency
+        ev: dict with daily_kwh, power_kw and optional plug_in_hour,
+            plug_out_hour
+
+    Returns:
+        DataFrame indexed by meter_id (or 0 for a single dataset) with
+        num_days and <Plan>_baseline_cost / <Plan>_optimized_cost columns;
+        baseline includes unmanaged EV charging and no battery
+    """
+    load, keys = daily_matrices(df)
+    meters = keys['meter_id'] if 'meter_id' in keys.columns else pd.Series(0, index=keys.index)
+
+    ev_options = {k: v for k, v in (ev or {}).items() if k not in ('daily_kwh', 'power_kw')}
+    ev_kwh = ev['daily_kwh'] if ev else 0
+
+    columns = {}
+    for plan, (name, _, _) in TIME_BASED_PLANS.items():
+        price = price_matrix(keys['date'], plan)
+
+        baseline_load = load
+        optimized_load = load
+        if ev:
+            baseline_load = load + ev_charging_days(price, ev['daily_kwh'], ev['power_kw'], optimize=False, **ev_options)
+            optimized_load = load + ev_charging_days(price, ev['daily_kwh'], ev['power_kw'], **ev_options)
+
+        optimized_grid = optimized_load
+        if battery:
+            optimized_grid, _ = optimize_battery_days(optimized_load, price, **battery)
+
+        columns[f'{name}_baseline_cost'] = (baseline_load * price).sum(axis=1)
+        columns[f'{name}_optimized_cost'] = (optimized_grid * price).sum(axis=1)
+
+    daily = pd.DataFrame(columns, index=keys.index)
+    daily['kwh'] = load.sum(axis=1)
+    grouped = daily.groupby(meters.to_numpy())
+
+    num_days = grouped.size()
+    costs = grouped.sum().mul(30 / num_days, axis=0)
+
+    # tiered pricing has no time component: a battery only adds losses, and
+    # EV charging only adds to monthly consumption
+    monthly_kwh = costs.pop('kwh') + ev_kwh * 30
+    tiered = calculate_tiered_costs(monthly_kwh)
+
+    costs.insert(0, 'Tiered_baseline_cost', tiered)
+    costs.insert(1, 'Tiered_optimized_cost', tiered)
+    costs.insert(0, 'num_days', num_days)
+    costs.index.name = 'meter_id'
+
+    return costs
+
+
+def optimize_all_plans(df, results, battery=None, ev=None):
+    """
+    Report optimized costs alongside calculate_all_plans results.
+
+    Args:
+        df: DataFrame with time metadata for a single dataset
+        results: Results from calculate_all_plans
+        battery: dict with capacity_kwh, power_kw and optional efficiency
+        ev: dict with daily_kwh, power_kw and optional plug_in_hour,
+            plug_out_hour
+
+    Returns:
+        dict: For each plan key, plan name, estimated_cost (from results),
+        baseline_cost, optimized_cost and savings (baseline - optimized)
+    """
+    costs = optimized_plan_costs(df, battery, ev).iloc[0]
+
+    optimized = {}
+    for plan_key, plan_data in results.items():
+        name = plan_data['plan']
+        baseline = costs[f'{name}_baseline_cost']
+        best = costs[f'{name}_optimized_cost']
+        optimized[plan_key] = {
+            'plan': name,
+            'estimated_cost': plan_data['total_cost'],
+            'baseline_cost': baseline,
+            'optimized_cost': best,
+            'savings': baseline - best
+        }
+
+    return optimized
@@ -0,0 +1,38 @@
+"""Shared fixtures for the test suite."""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _hourly_usage(days, start='2026-01-05', seed=0, scale=1.0):
+    """Build synthetic hourly usage with an evening peak and billed cost."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=days * 24, freq='h')
+
+    # overnight base load, evening peak, random noise
+    shape = 0.4 + 0.8 * np.exp(-((index.hour - 18) ** 2) / 8)
+    kwh = scale * shape * rng.gamma(4, 0.25, len(index))
+
+    return pd.DataFrame({
+        'datetime': index,
+        'kwh': kwh,
+        'actual_cost': kwh * 0.12
+    })
+
+
+@pytest.fixture
+def hourly_usage():
+    """
+    Factory for synthetic hourly usage.
+
+    Returns:
+        function: (days, start='2026-01-05', seed=0, scale=1.0) -> DataFrame
+        with datetime, kwh and actual_cost columns
+    """
+    return _hourly_usage
@@ -0,0 +1,91 @@
+"""Merged chunk partials must reproduce the in-memory analysis."""
+
+from functools import reduce
+import numpy as np
+import pandas as pd
+import pytest
+from chunked_pipeline import (
+    empty_partial, summarize_chunk, merge_partials, finalize_analysis, daily_from_partial,
+    actual_cost_from_partial
+)
+from cost_validator import calculate_actual_cost
+from data_aggregator import (
+    aggregate_hourly_data, save_aggregated_data, append_aggregated_block, save_aggregated_blocks
+)
+from usage_analyzer import add_time_metadata, analyze_patterns, daily_period_kwh
+
+
+def _enriched(hourly_usage):
+    """Ten weeks spanning three months, with a few missing readings."""
+    df = hourly_usage(70, start='2026-01-20')
+    df.loc[[5, 500, 501, 1200], 'kwh'] = np.nan
+    return add_time_metadata(df)
+
+
+def _merge_chunks(enriched, freq):
+    """Summarize each chunk and merge the partials in order."""
+    chunks = [chunk for _, chunk in enriched.groupby(enriched['datetime'].dt.to_period(freq))]
+    return reduce(merge_partials, (summarize_chunk(chunk) for chunk in chunks), empty_partial())
+
+
+@pytest.mark.parametrize('freq', ['D', 'M'])
+def test_merged_partials_match_analyze_patterns(hourly_usage, freq):
+    enriched = _enriched(hourly_usage)
+    expected = analyze_patterns(enriched)
+
+    analysis = finalize_analysis(_merge_chunks(enriched, freq))
+
+    for key in ['num_days', 'num_weekdays', 'num_weekends']:
+        assert analysis[key] == expected[key]
+    for key in ['total_kwh', 'weekday_kwh', 'weekend_kwh', 'avg_daily_kwh', 'monthly_kwh_projected']:
+        assert analysis[key] == pytest.approx(expected[key])
+    for key in ['weekday_hourly', 'weekend_hourly', 'tou_breakdown', 'ulo_breakdown']:
+        assert analysis[key].keys() == expected[key].keys()
+        assert list(analysis[key].values()) == pytest.approx([expected[key][k] for k in analysis[key]])
+
+
+def test_merged_daily_and_actual_cost_match(hourly_usage):
+    enriched = _enriched(hourly_usage)
+
+    partial = _merge_chunks(enriched, 'M')
+
+    pd.testing.assert_frame_equal(daily_from_partial(partial), daily_period_kwh(enriched))
+    expected = calculate_actual_cost(enriched)
+    actual = actual_cost_from_partial(partial)
+    assert actual['period_days'] == expected['period_days']
+    assert actual['billed_hours'] == expected['billed_hours']
+    assert actual['projected_monthly_actual'] == pytest.approx(expected['projected_monthly_actual'])
+    assert actual['total_actual_cost'] == pytest.approx(expected['total_actual_cost'])
+
+
+def test_merge_is_order_independent(hourly_usage):
+    enriched = _enriched(hourly_usage)
+    first = summarize_chunk(enriched.iloc[:900])
+    second = summarize_chunk(enriched.iloc[900:])
+
+    forward = finalize_analysis(merge_partials(first, second))
+    backward = finalize_analysis(merge_partials(second, first))
+
+    assert forward['total_kwh'] == pytest.approx(backward['total_kwh'])
+    assert forward['ulo_breakdown'] == pytest.approx(backward['ulo_breakdown'])
+    assert forward['start_datetime'] == backward['start_datetime'] == enriched['datetime'].min()
+
+
+def test_empty_history_raises():
+    with pytest.raises(ValueError):
+        finalize_analysis(empty_partial())
+
+
+def test_stitched_blocks_match_whole_csv(hourly_usage, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = hourly_usage(40, start='2026-01-20')
+    # a missing hour leaves a blank cell, as in the whole-history pivot
+    df = df.drop(index=[100])
+
+    expected = open(save_aggregated_data(aggregate_hourly_data(df), 'whole')).read()
+
+    chunks = [chunk for _, chunk in df.groupby(df['datetime'].dt.to_period('M'))]
+    with open(tmp_path / 'scratch', 'wb') as scratch:
+        offsets = [append_aggregated_block(scratch, aggregate_hourly_data(chunk)) for chunk in chunks]
+
+    assert open(save_aggregated_blocks(tmp_path / 'scratch', offsets, 'chunked')).read() == expected
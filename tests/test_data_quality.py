@@ -0,0 +1,106 @@
+"""Gap, duplicate and outlier detection, imputation and billed-cost projection."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from cost_validator import calculate_actual_cost
+from data_quality import find_gaps, flag_outliers, impute_by_hour_of_week, check_data_quality
+
+
+def test_find_gaps_reports_runs():
+    index = pd.date_range('2026-01-05', periods=10, freq='h')
+    missing = np.array([1, 1, 0, 0, 1, 0, 0, 1, 1, 1], dtype=bool)
+
+    gaps = find_gaps(missing, index)
+
+    assert gaps['hours'].tolist() == [2, 1, 3]
+    assert gaps['start'].tolist() == [index[0], index[4], index[7]]
+    assert gaps['end'].tolist() == [index[1], index[4], index[9]]
+
+
+def test_find_gaps_none_missing():
+    index = pd.date_range('2026-01-05', periods=5, freq='h')
+    assert find_gaps(np.zeros(5, dtype=bool), index).empty
+
+
+def test_flag_outliers_by_hour_of_day():
+    hour = pd.Series(np.tile(np.arange(24), 14))
+    kwh = pd.Series(1.0 + 0.1 * np.sin(np.arange(len(hour))))
+    kwh[30] = 25.0
+    kwh[31] = -0.5
+    kwh[32] = np.nan
+
+    flagged = flag_outliers(kwh, hour)
+
+    assert flagged[30] and flagged[31]
+    assert not flagged[32]
+    assert flagged.sum() == 2
+
+
+def test_flag_outliers_constant_hour_never_flags_positive():
+    # zero spread: nothing to scale against, only negatives are flagged
+    hour = pd.Series(np.zeros(10, dtype=int))
+    kwh = pd.Series([2.0] * 9 + [3.0])
+    assert not flag_outliers(kwh, hour).any()
+
+
+def test_impute_by_hour_of_week_fallbacks():
+    values = pd.Series([1.0, 3.0, np.nan, np.nan, np.nan, 50.0])
+    hour_of_week = pd.Series([0, 0, 0, 1, 2, 2])
+    hour = pd.Series([0, 0, 0, 1, 0, 0])
+    usable = values.notna() & (values < 10)
+
+    filled = impute_by_hour_of_week(values, hour_of_week, hour, usable)
+
+    # same hour of week, then same hour of day (outlier excluded), then overall
+    assert filled[2] == 2.0
+    assert filled[4] == 2.0
+    assert filled[3] == 2.0
+    assert filled[5] == 50.0
+
+
+def test_duplicate_and_conflict_counts(hourly_usage):
+    df = hourly_usage(3)
+    repeated = df.iloc[[10, 11, 12]].copy()
+    repeated.loc[repeated.index[0], 'kwh'] += 1.0
+
+    _, quality = check_data_quality(pd.concat([df, repeated], ignore_index=True))
+
+    assert quality['duplicate_hours'] == 3
+    assert quality['conflicting_duplicates'] == 1
+    assert quality['missing_hours'] == 0
+
+
+def test_missing_rows_dropped_blank_readings_kept(hourly_usage):
+    df = hourly_usage(4)
+    df = df.drop(index=range(30, 36)).reset_index(drop=True)
+    df.loc[50, 'kwh'] = np.nan
+
+    cleaned, quality = check_data_quality(df)
+
+    assert quality['missing_hours'] == 7
+    assert quality['blank_hours'] == 1
+    assert quality['gap_count'] == 2
+    assert quality['longest_gap_hours'] == 6
+    assert quality['partial_days'] == 2
+    # the blank reading keeps its billed cost
+    assert len(cleaned) == 4 * 24 - 6
+    assert cleaned['actual_cost'].sum() == pytest.approx(df['actual_cost'].sum())
+
+
+def test_imputed_hours_leave_billed_projection_unchanged(hourly_usage):
+    df = hourly_usage(14)
+    complete = calculate_actual_cost(df)
+    gappy = df.drop(index=range(48, 96)).reset_index(drop=True)
+
+    filled, quality = check_data_quality(gappy, impute=True)
+    actual = calculate_actual_cost(filled)
+
+    assert quality['imputed_hours'] == 48
+    assert filled['kwh'].notna().all()
+    assert filled['actual_cost'].isna().sum() == 48
+    assert actual['billed_hours'] == 12 * 24
+    assert actual['projected_monthly_actual'] == pytest.approx(
+        gappy['actual_cost'].sum() / 12 * 30
+    )
+    assert complete['projected_monthly_actual'] == pytest.approx(df['actual_cost'].sum() / 14 * 30)
@@ -0,0 +1,57 @@
+"""Fleet costs must match the single-dataset pipeline meter by meter."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fleet_analyzer import prepare_fleet_data, analyze_fleet_plans
+from rate_calculator import (
+    calculate_all_plans, calculate_tiered_cost, calculate_tiered_costs, determine_optimal_plan
+)
+from usage_analyzer import add_time_metadata, analyze_patterns
+
+
+def _fleet(hourly_usage):
+    """Three meters with different lengths, levels and start dates."""
+    meters = [
+        hourly_usage(30, seed=1, scale=0.8),
+        hourly_usage(45, start='2026-02-02', seed=2, scale=2.5),
+        hourly_usage(12, start='2026-03-07', seed=3, scale=1.2)
+    ]
+    df = pd.concat([m.assign(meter_id=f'm{i}') for i, m in enumerate(meters)])
+    return df.rename(columns={'actual_cost': 'cost'}), meters
+
+
+def test_fleet_costs_match_single_meter_runs(hourly_usage):
+    df, meters = _fleet(hourly_usage)
+    results = analyze_fleet_plans(prepare_fleet_data(df))
+
+    for i, meter in enumerate(meters):
+        enriched = add_time_metadata(meter)
+        analysis = analyze_patterns(enriched)
+        expected = calculate_all_plans(enriched, analysis)
+        row = results.loc[f'm{i}']
+
+        assert row['num_days'] == analysis['num_days']
+        assert row['monthly_kwh_projected'] == pytest.approx(analysis['monthly_kwh_projected'])
+        for key, plan in [('tiered', 'Tiered'), ('tou', 'TOU'), ('ulo', 'ULO')]:
+            assert row[f'{plan}_cost'] == pytest.approx(expected[key]['total_cost'])
+        assert row['optimal_plan'] == determine_optimal_plan(expected)
+
+
+def test_prepare_fleet_data_sorts_and_removes_duplicates(hourly_usage):
+    df, _ = _fleet(hourly_usage)
+    shuffled = pd.concat([df, df.head(50)]).sample(frac=1, random_state=0)
+
+    prepared = prepare_fleet_data(shuffled)
+
+    assert list(prepared.columns) == ['meter_id', 'datetime', 'kwh', 'actual_cost']
+    assert len(prepared) == len(df)
+    assert prepared.equals(prepared.sort_values(['meter_id', 'datetime']).reset_index(drop=True))
+
+
+def test_vectorized_tiered_cost_matches_scalar():
+    monthly_kwh = np.array([0, 250.5, 999.9, 1000, 1000.1, 2750])
+
+    expected = [calculate_tiered_cost({'monthly_kwh_projected': kwh})['total_cost'] for kwh in monthly_kwh]
+
+    assert calculate_tiered_costs(monthly_kwh) == pytest.approx(expected)
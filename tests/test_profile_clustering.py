@@ -0,0 +1,85 @@
+"""Profiles, k-means and the short-history plan fallback."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from profile_clustering import (
+    HOURS_PER_WEEK, MIN_DAYS_FOR_RECOMMENDATION, build_profile, build_fleet_profiles, assign_clusters,
+    kmeans, fit_profile_model, save_profile_model, load_profile_model, cluster_plan, nearest_profiles
+)
+from rate_calculator import determine_optimal_plan
+
+
+def _blobs(per_cluster=40, seed=0):
+    """Three well-separated groups of profiles."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, 3, (3, HOURS_PER_WEEK))
+    X = np.vstack([center + rng.normal(0, 0.05, (per_cluster, HOURS_PER_WEEK)) for center in centers])
+    return X.astype(np.float32), np.repeat(np.arange(3), per_cluster)
+
+
+def test_kmeans_recovers_separated_clusters():
+    X, truth = _blobs()
+
+    centroids, labels = kmeans(X, 3, seed=1)
+
+    # each true group maps to exactly one label, and vice versa
+    pairs = set(zip(truth.tolist(), labels.tolist()))
+    assert len(pairs) == 3 and len({label for _, label in pairs}) == 3
+    for label in range(3):
+        assert centroids[label] == pytest.approx(X[labels == label].mean(axis=0), abs=1e-4)
+
+
+def test_blocked_assignment_matches_single_block():
+    X, _ = _blobs()
+    centroids = X[[0, 50, 100]]
+
+    assert np.array_equal(assign_clusters(X, centroids, block_size=7)[0], assign_clusters(X, centroids)[0])
+
+    rows, distances = nearest_profiles(X[5], X, n=3, block_size=16)
+    expected = np.argsort(((X - X[5]) ** 2).sum(axis=1), kind='stable')[:3]
+    assert rows.tolist() == expected.tolist()
+    assert distances[0] == pytest.approx(0, abs=1e-3)
+
+
+def test_fleet_profiles_match_single_profiles(hourly_usage):
+    meters = [hourly_usage(10, seed=1), hourly_usage(17, start='2026-02-01', seed=2)]
+    # a missing hour of week is filled from the same hour on other days
+    meters[1] = meters[1][meters[1]['datetime'].dt.dayofweek != 2]
+    df = pd.concat([m.assign(meter_id=i) for i, m in enumerate(meters)])
+
+    meter_ids, matrix = build_fleet_profiles(df)
+
+    assert meter_ids.tolist() == [0, 1]
+    for i, meter in enumerate(meters):
+        assert matrix[i] == pytest.approx(build_profile(meter), rel=1e-6)
+    assert not np.isnan(matrix).any()
+
+
+def test_model_round_trip_and_short_history_fallback(tmp_path):
+    X, truth = _blobs()
+    plans = np.array(['Tiered', 'TOU', 'ULO'])[truth]
+    index = pd.DataFrame({
+        'identifier': np.arange(len(X)),
+        'num_days': MIN_DAYS_FOR_RECOMMENDATION,
+        'optimal_plan': plans
+    })
+    # short histories are left out of the plan distribution
+    index.loc[:9, 'num_days'] = 5
+    index.loc[:9, 'optimal_plan'] = 'TOU'
+
+    save_profile_model(fit_profile_model(index, X, k=3), tmp_path)
+    model = load_profile_model(tmp_path)
+
+    assert load_profile_model(tmp_path / 'missing') is None
+    assert model['counts'].sum() == len(X) - 10
+    plan, _, shares = cluster_plan(X[0], model)
+    assert plan == 'Tiered' and shares['Tiered'] == 1.0
+
+    # the cluster's plan replaces the cheapest plan only for short histories
+    results = {key: {'total_cost': cost} for key, cost in [('tiered', 90), ('tou', 80), ('ulo', 85)]}
+    short = {'num_days': MIN_DAYS_FOR_RECOMMENDATION - 1}
+    long = {'num_days': MIN_DAYS_FOR_RECOMMENDATION}
+    assert determine_optimal_plan(results, short, X[0], model) == 'Tiered'
+    assert determine_optimal_plan(results, long, X[0], model) == 'TOU'
+    assert determine_optimal_plan(results, short, X[0], None) == 'TOU'
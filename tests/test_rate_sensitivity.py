@@ -0,0 +1,79 @@
+"""Swept costs and breakevens must agree with rate_calculator."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import rate_plans
+from fleet_analyzer import prepare_fleet_data, analyze_fleet, analyze_fleet_plans
+from rate_calculator import calculate_all_plans, determine_optimal_plan
+from rate_sensitivity import sweep_rates, rate_grid, parse_rate_param
+from usage_analyzer import add_time_metadata, analyze_patterns
+
+
+def _analysis(hourly_usage, **kwargs):
+    enriched = add_time_metadata(hourly_usage(28, **kwargs))
+    return enriched, analyze_patterns(enriched)
+
+
+def test_grid_costs_match_calculate_all_plans(hourly_usage, monkeypatch):
+    enriched, analysis = _analysis(hourly_usage, scale=2.0)
+    x_values = np.linspace(0.2, 0.5, 4)
+    y_values = np.array([600, 900, 1200])
+
+    sweep = sweep_rates(analysis, 'ulo.on_peak', x_values, 'tiered.tier1_limit', y_values, return_costs=True)
+
+    for i, x in enumerate(x_values):
+        for j, y in enumerate(y_values):
+            monkeypatch.setitem(rate_plans.ULO_RATES, 'on_peak', x)
+            monkeypatch.setitem(rate_plans.TIERED_RATES, 'tier1_limit', y)
+            results = calculate_all_plans(enriched, analysis)
+
+            expected = [results[key]['total_cost'] for key in ('tiered', 'tou', 'ulo')]
+            assert sweep['costs'][0, :, i, j] == pytest.approx(expected)
+            assert sweep['plans'][sweep['optimal'][0, i, j]] == determine_optimal_plan(results)
+
+
+def test_breakeven_matches_closed_form(hourly_usage):
+    _, analysis = _analysis(hourly_usage)
+    results = calculate_all_plans(None, analysis)
+    multiplier = 30 / analysis['num_days']
+
+    # ULO cost is linear in the on-peak price; find where it meets the cheaper alternative
+    on_peak_kwh = analysis['ulo_breakdown']['on_peak'] * multiplier
+    ulo_without_on_peak = results['ulo']['total_cost'] - results['ulo']['on_peak_cost']
+    alternative = min(results['tiered']['total_cost'], results['tou']['total_cost'])
+    expected = (alternative - ulo_without_on_peak) / on_peak_kwh
+
+    sweep = sweep_rates(analysis, 'ulo.on_peak', np.linspace(0.0, expected * 3, 37))
+    assert sweep['plans'][sweep['optimal'][0, 0]] == 'ULO'
+    assert sweep['breakeven'][0] == pytest.approx(expected, rel=1e-6)
+
+
+def test_breakeven_is_nan_without_a_flip(hourly_usage):
+    _, analysis = _analysis(hourly_usage)
+
+    sweep = sweep_rates(analysis, 'ulo.ultra_low', [0.038, 0.039, 0.040])
+
+    assert np.isnan(sweep['breakeven'][0])
+
+
+def test_fleet_sweep_matches_fleet_optimal(hourly_usage):
+    meters = [hourly_usage(21, seed=seed, scale=scale) for seed, scale in [(1, 0.5), (2, 3.0), (3, 1.0)]]
+    df = prepare_fleet_data(pd.concat([m.assign(meter_id=i) for i, m in enumerate(meters)]))
+    default = rate_plans.ULO_RATES['on_peak']
+
+    sweep = sweep_rates(analyze_fleet(df), 'ulo.on_peak', [default])
+
+    plans = np.array(sweep['plans'])[sweep['optimal'][:, 0]]
+    assert list(plans) == list(analyze_fleet_plans(df).loc[sweep['index'], 'optimal_plan'])
+
+
+def test_unknown_rate_parameter_raises():
+    assert parse_rate_param('tou.mid_peak') == ('tou', 'mid_peak')
+    with pytest.raises(ValueError):
+        parse_rate_param('ulo.shoulder')
+
+
+def test_same_parameter_on_both_axes_raises():
+    with pytest.raises(ValueError):
+        rate_grid('ulo.on_peak', [0.2, 0.3], 'ulo.on_peak', [0.4, 0.5])
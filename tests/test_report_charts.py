@@ -0,0 +1,53 @@
+"""Report charts must stay small and handle short histories."""
+
+import numpy as np
+import pytest
+from rate_calculator import calculate_all_plans
+from report_charts import downsample, build_report_charts
+from usage_analyzer import add_time_metadata, analyze_patterns, daily_period_kwh
+
+
+def _report_inputs(hourly_usage, days):
+    enriched = add_time_metadata(hourly_usage(days))
+    analysis = analyze_patterns(enriched)
+    return analysis, calculate_all_plans(enriched, analysis), daily_period_kwh(enriched)
+
+
+def test_downsample_preserves_means():
+    values = np.random.default_rng(0).random((1000, 3))
+
+    averaged, starts = downsample(values, 120)
+
+    sizes = np.diff(np.append(starts, len(values)))
+    assert len(averaged) == 120 and starts[0] == 0
+    assert (averaged * sizes[:, None]).sum(axis=0) == pytest.approx(values.sum(axis=0))
+    assert averaged[0] == pytest.approx(values[:sizes[0]].mean(axis=0))
+
+    short, starts = downsample(values[:50], 120)
+    assert np.array_equal(short, values[:50]) and starts.tolist() == list(range(50))
+
+
+def test_charts_respect_byte_budget(hourly_usage):
+    analysis, results, daily = _report_inputs(hourly_usage, 3 * 365)
+
+    charts = build_report_charts(analysis, results, daily)
+    assert all(charts.values())
+    assert all(len(svg.encode('utf-8')) <= 16 * 1024 for svg in charts.values())
+    assert 'nan' not in charts['daily_cost']
+
+    # a long cost history is downsampled to fit; fixed-size charts are dropped
+    tight = build_report_charts(analysis, results, daily, byte_budget=2000)
+    assert tight['daily_cost'] and len(tight['daily_cost'].encode('utf-8')) <= 2000
+    assert len(tight['daily_cost']) < len(charts['daily_cost'])
+    assert tight['hourly_profile'] == ''
+
+
+@pytest.mark.parametrize('days', [0, 1])
+def test_short_daily_history(hourly_usage, days):
+    analysis, results, daily = _report_inputs(hourly_usage, 1)
+
+    charts = build_report_charts(analysis, results, daily.iloc[:days])
+
+    assert (charts['daily_cost'] != '') == (days == 1)
+    assert charts['hourly_profile'] and charts['period_share']
+    assert all('nan' not in svg for svg in charts.values())
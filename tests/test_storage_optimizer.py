@@ -0,0 +1,131 @@
+"""Battery and EV schedules must be feasible and cost-optimal."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from rate_calculator import calculate_all_plans
+from storage_optimizer import (
+    daily_matrices, price_matrix, optimize_battery_days, ev_charging_days, optimized_plan_costs
+)
+from usage_analyzer import add_time_metadata, analyze_patterns
+
+
+def _reference_battery_cost(load, price, capacity_kwh, power_kw, efficiency, soc_steps):
+    """Plain dynamic program over every state pair for one day."""
+    levels = np.linspace(0, capacity_kwh, soc_steps + 1)
+    value = [0.0] + [np.inf] * soc_steps
+
+    for hour in range(24):
+        new_value = [np.inf] * (soc_steps + 1)
+        for i, start in enumerate(levels):
+            for j, end in enumerate(levels):
+                change = end - start
+                battery = change / efficiency if change > 0 else change
+                if battery > power_kw + 1e-9 or -change > power_kw + 1e-9:
+                    continue
+                cost = value[i] + max(load[hour] + battery, 0) * price[hour]
+                new_value[j] = min(new_value[j], cost)
+        value = new_value
+
+    return min(value)
+
+
+def _ulo_prices(days, start='2026-01-05'):
+    """ULO prices for consecutive days."""
+    return price_matrix(pd.Series(pd.date_range(start, periods=days, freq='D')), 'ulo')
+
+
+@pytest.mark.parametrize('capacity_kwh, power_kw', [(13.5, 5), (10, 100), (5, 0.3)])
+def test_battery_matches_reference_dynamic_program(capacity_kwh, power_kw):
+    rng = np.random.default_rng(0)
+    load = rng.gamma(2, 0.5, (4, 24))
+    price = rng.choice([0.039, 0.098, 0.157, 0.391], (4, 24))
+
+    grid, _ = optimize_battery_days(load, price, capacity_kwh, power_kw, soc_steps=6)
+
+    expected = [_reference_battery_cost(load[d], price[d], capacity_kwh, power_kw, 0.9, 6) for d in range(4)]
+    assert (grid * price).sum(axis=1) == pytest.approx(expected, rel=1e-5)
+
+
+def test_battery_schedule_is_feasible_and_never_costs_more():
+    rng = np.random.default_rng(1)
+    load = rng.gamma(2, 0.5, (30, 24))
+    price = _ulo_prices(30)
+
+    grid, soc = optimize_battery_days(load, price, 13.5, 5, efficiency=0.9)
+
+    change = np.diff(soc, axis=1)
+    assert soc[:, 0] == pytest.approx(0)
+    assert soc.min() >= 0 and soc.max() <= 13.5 + 1e-9
+    assert (change / 0.9).max() <= 5 + 1e-6 and -change.min() <= 5 + 1e-6
+    assert grid.min() >= 0
+    assert ((grid * price).sum(axis=1) <= (load * price).sum(axis=1) + 1e-6).all()
+
+
+def test_battery_shifts_cheap_energy_to_peak():
+    # flat 1 kWh load; with 1 kWh steps and no losses the optimum is exact
+    load = np.ones((1, 24))
+    price = np.full((1, 24), 0.10)
+    price[0, :7] = 0.05
+    price[0, 17:21] = 0.40
+
+    grid, _ = optimize_battery_days(load, price, capacity_kwh=4, power_kw=4, efficiency=1.0, soc_steps=4)
+
+    assert (grid * price).sum() == pytest.approx((load * price).sum() - 4 * (0.40 - 0.05))
+
+
+def test_ev_charging_fills_cheapest_hours():
+    price = _ulo_prices(7)
+
+    optimized = ev_charging_days(price, daily_kwh=10, power_kw=7.2)
+    unmanaged = ev_charging_days(price, daily_kwh=10, power_kw=7.2, optimize=False)
+
+    for charge in (optimized, unmanaged):
+        assert charge.sum(axis=1) == pytest.approx(10)
+        assert charge.max() <= 7.2
+        # plugged in from 18:00 to 07:00
+        assert charge[:, 7:18].sum() == 0
+    # ULO's ultra-low period starts at 23:00
+    assert optimized[:, 18:23].sum() == 0
+    assert (optimized * price).sum() < (unmanaged * price).sum()
+
+    with pytest.raises(ValueError):
+        ev_charging_days(price, daily_kwh=100, power_kw=7.2)
+
+
+@pytest.mark.parametrize('capacity_kwh, power_kw, efficiency', [
+    (0, 5, 0.9), (-1, 5, 0.9), (10, -1, 0.9), (10, 5, 0), (10, 5, 1.2), (np.nan, 5, 0.9)
+])
+def test_battery_rejects_invalid_parameters(capacity_kwh, power_kw, efficiency):
+    price = _ulo_prices(2)
+    with pytest.raises(ValueError):
+        optimize_battery_days(np.ones_like(price), price, capacity_kwh, power_kw, efficiency)
+
+
+def test_ev_rejects_negative_parameters():
+    price = _ulo_prices(2)
+    with pytest.raises(ValueError):
+        ev_charging_days(price, daily_kwh=-5, power_kw=7.2)
+    with pytest.raises(ValueError):
+        ev_charging_days(price, daily_kwh=5, power_kw=-7.2)
+
+
+def test_baseline_costs_match_calculate_all_plans(hourly_usage):
+    enriched = add_time_metadata(hourly_usage(28))
+    results = calculate_all_plans(enriched, analyze_patterns(enriched))
+
+    costs = optimized_plan_costs(enriched).iloc[0]
+
+    for key, plan in [('tiered', 'Tiered'), ('tou', 'TOU'), ('ulo', 'ULO')]:
+        assert costs[f'{plan}_baseline_cost'] == pytest.approx(results[key]['total_cost'])
+        assert costs[f'{plan}_optimized_cost'] == pytest.approx(results[key]['total_cost'])
+
+
+def test_daily_matrices_fill_missing_hours(hourly_usage):
+    df = add_time_metadata(hourly_usage(3).drop(index=[30, 31]))
+
+    load, keys = daily_matrices(df)
+
+    assert load.shape == (3, 24) and len(keys) == 3
+    assert load[1, 6:8].tolist() == [0, 0]
+    assert load.sum() == pytest.approx(df['kwh'].sum())
@@ -0,0 +1,100 @@
+"""Change detection, debouncing and worker pool recovery in the watch daemon."""
+
+import os
+from watch_daemon import WatchDaemon, changed_identifiers
+
+
+def _crash_or_print(identifier):
+    """Analysis stand-in that kills its worker process for "crash"."""
+    if identifier == 'crash':
+        os._exit(1)
+    print(f"analyzed {identifier}")
+
+
+def _queued(daemon):
+    """Identifiers in the order workers would take them."""
+    return [identifier for _, _, identifier in sorted(daemon._queue.queue)]
+
+
+def test_changed_identifiers():
+    previous = {
+        'same': {'a.xlsx': (1, 10)},
+        'modified': {'a.xlsx': (1, 10)},
+        'emptied': {'a.xlsx': (1, 10)},
+        'shrunk': {'a.xlsx': (1, 10), 'b.xlsx': (2, 20)}
+    }
+    current = {
+        'same': {'a.xlsx': (1, 10)},
+        'modified': {'a.xlsx': (2, 10)},
+        'emptied': {},
+        'shrunk': {'a.xlsx': (1, 10)},
+        'new': {'a.xlsx': (3, 30)}
+    }
+
+    assert changed_identifiers(previous, current) == {'modified', 'shrunk', 'new'}
+    assert changed_identifiers({}, {'empty': {}}) == set()
+
+
+def test_debounce_waits_for_quiet_period():
+    daemon = WatchDaemon(debounce=10, max_wait=100)
+
+    daemon.observe({'a'}, 0)
+    daemon.observe({'a'}, 8)
+    assert daemon.schedule_ready(15) == []
+    assert daemon.schedule_ready(18) == ['a']
+    assert _queued(daemon) == ['a']
+    assert daemon.stats()['pending'] == []
+
+
+def test_max_wait_caps_a_steady_stream_of_changes():
+    daemon = WatchDaemon(debounce=10, max_wait=30)
+
+    for now in range(0, 30, 5):
+        daemon.observe({'a'}, now)
+        assert daemon.schedule_ready(now) == []
+    daemon.observe({'a'}, 30)
+    assert daemon.schedule_ready(30) == ['a']
+
+
+def test_enqueue_deduplicates_and_marks_reruns():
+    daemon = WatchDaemon(debounce=0)
+
+    daemon.observe({'a'}, 0)
+    daemon.schedule_ready(0)
+    daemon.observe({'a'}, 1)
+    daemon.schedule_ready(1)
+    assert _queued(daemon) == ['a']
+
+    # an identifier changing while it runs is queued again afterwards
+    daemon._queue.get_nowait()
+    daemon._queued.pop('a')
+    daemon._running.add('a')
+    daemon.observe({'a'}, 2)
+    assert daemon.schedule_ready(2) == ['a']
+    assert daemon._queue.empty()
+    assert daemon._rerun == {'a'}
+
+
+def test_new_identifiers_run_before_reanalyses():
+    daemon = WatchDaemon(debounce=0)
+    daemon._analyzed.add('old')
+
+    daemon.observe({'old'}, 0)
+    daemon.observe({'new'}, 5)
+    daemon.schedule_ready(5)
+
+    assert _queued(daemon) == ['new', 'old']
+
+
+def test_dead_worker_process_fails_only_its_job():
+    daemon = WatchDaemon(workers=1, analyze=_crash_or_print)
+    daemon._pool = daemon._new_pool()
+    try:
+        output, error = daemon._run_in_pool('crash')
+        assert output == '' and error
+
+        output, error = daemon._run_in_pool('ok')
+        assert error is None
+        assert output == 'analyzed ok\n'
+    finally:
+        daemon._pool.shutdown()
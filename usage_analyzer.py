@@ -1,7 +1,7 @@
 """Analyze electricity usage patterns."""
 
 import pandas as pd
-from rate_plans import get_tou_period, get_ulo_period
+from rate_plans import TOU_PERIODS, ULO_PERIODS, classify_tou_periods, classify_ulo_periods
 
 
 def add_time_metadata(df):
@@ -22,18 +22,35 @@ def add_time_metadata(df):
     df.loc[:, 'is_weekend'] = df['day_of_week'] >= 5
 
     # classify into pricing periods
-    df.loc[:, 'tou_period'] = df.apply(
-        lambda row: get_tou_period(row['hour'], row['day_of_week']),
-        axis=1
-    )
-    df.loc[:, 'ulo_period'] = df.apply(
-        lambda row: get_ulo_period(row['hour'], row['day_of_week']),
-        axis=1
-    )
+    df.loc[:, 'tou_period'] = classify_tou_periods(df['hour'], df['day_of_week'])
+    df.loc[:, 'ulo_period'] = classify_ulo_periods(df['hour'], df['day_of_week'])
 
     return df
 
 
+def daily_period_kwh(df):
+    """
+    Pre-aggregate hourly data into daily kWh per pricing period.
+
+    Args:
+        df: DataFrame with time metadata (from add_time_metadata)
+
+    Returns:
+        DataFrame indexed by date with tou_<period> and ulo_<period> columns
+    """
+    dates = df['datetime'].dt.normalize()
+
+    tou = df.groupby([dates, 'tou_period'])['kwh'].sum().unstack(fill_value=0)
+    tou = tou.reindex(columns=list(TOU_PERIODS), fill_value=0).add_prefix('tou_')
+    ulo = df.groupby([dates, 'ulo_period'])['kwh'].sum().unstack(fill_value=0)
+    ulo = ulo.reindex(columns=list(ULO_PERIODS), fill_value=0).add_prefix('ulo_')
+
+    daily = tou.join(ulo)
+    daily.index.name = 'date'
+
+    return daily
+
+
 def analyze_patterns(df):
     """
     Analyze usage patterns and generate statistics.
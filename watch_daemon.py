@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Watch-folder daemon for electricity rate analysis.
+
+Polls ./data/ for new or changed Excel exports, waits for bursts of files
+to settle, and re-analyzes only the affected identifiers on a bounded pool
+of worker processes. Worker processes are reused, so imports and the
+compiled report template stay warm between jobs.
+"""
+
+import io
+import os
+import json
+import time
+import queue
+import signal
+import argparse
+import itertools
+import threading
+import contextlib
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from analyze import run_analysis
+from chunked_pipeline import CHUNK_MODES
+
+
+DATA_DIR = './data'
+STATS_PATH = './output/daemon_stats.json'
+
+
+def scan_data_tree(data_dir=DATA_DIR):
+    """
+    Snapshot the Excel files under each identifier folder.
+
+    Args:
+        data_dir: Directory containing one folder per identifier
+
+    Returns:
+        dict: identifier -> {filename: (mtime_ns, size)}
+    """
+    snapshot = {}
+    if not os.path.isdir(data_dir):
+        return snapshot
+
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            files = {}
+            with os.scandir(entry.path) as inner:
+                for item in inner:
+                    # skip Office lock files for exports still open
+                    if item.name.endswith('.xlsx') and not item.name.startswith('~$') and item.is_file():
+                        stat = item.stat()
+                        files[item.name] = (stat.st_mtime_ns, stat.st_size)
+            snapshot[entry.name] = files
+
+    return snapshot
+
+
+def changed_identifiers(previous, current):
+    """
+    Find identifiers whose files were added, modified or removed.
+
+    Args:
+        previous: Earlier snapshot from scan_data_tree
+        current: Later snapshot from scan_data_tree
+
+    Returns:
+        set: Identifiers that changed and still have files
+    """
+    return {
+        identifier for identifier, files in current.items()
+        if files and previous.get(identifier) != files
+    }
+
+
+def _ignore_interrupts():
+    """Leave Ctrl-C to the daemon so worker processes finish their jobs."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _run_job(analyze, identifier, options):
+    """
+    Run one analysis in a worker process, capturing what it prints.
+
+    Args:
+        analyze: Function taking an identifier that runs the analysis
+        identifier: Dataset identifier
+        options: Keyword arguments for analyze
+
+    Returns:
+        tuple: (captured output, error message or None)
+    """
+    output = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(output):
+        try:
+            analyze(identifier, **options)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+    return output.getvalue(), error
+
+
+def _summarize(values):
+    """Return last, mean and max of a list of durations."""
+    if not values:
+        return {'last': None, 'mean': None, 'max': None}
+    return {'last': values[-1], 'mean': sum(values) / len(values), 'max': max(values)}
+
+
+class WatchDaemon:
+    """
+    Debounce data folder changes and analyze identifiers in worker processes.
+
+    Each worker thread hands its job to a process pool, so analyses run in
+    parallel despite the GIL, and prints the job's captured output as one
+    block prefixed with the identifier. Identifiers never analyzed by this
+    daemon run first; otherwise the earliest change is served first. An
+    identifier that changes while it is queued is analyzed once; one that
+    changes while running is queued again when the run finishes.
+    """
+
+    def __init__(self, workers=2, debounce=30.0, max_wait=300.0, analysis_options=None,
+                 analyze=run_analysis, history=1000):
+        """
+        Args:
+            workers: Number of concurrent analyses
+            debounce: Seconds an identifier must be quiet before analysis
+            max_wait: Seconds after the first change to analyze even if
+                files keep arriving
+            analysis_options: Keyword arguments for analyze
+            analyze: Module-level function taking an identifier that runs
+                the analysis (it is sent to worker processes)
+            history: Number of job latencies kept for statistics
+        """
+        self.workers = workers
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.analysis_options = analysis_options or {}
+        self.analyze = analyze
+
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._pool = None
+
+        # identifier -> (first change, last change)
+        self._pending = {}
+        self._queued = {}  # identifier -> enqueue time
+        self._running = set()
+        self._rerun = set()
+        self._analyzed = set()
+
+        self._completed = 0
+        self._failed = 0
+        self._run_seconds = deque(maxlen=history)
+        self._wait_seconds = deque(maxlen=history)
+        self._last_job = None
+
+    def observe(self, identifiers, now):
+        """
+        Record that identifiers changed.
+
+        Args:
+            identifiers: Changed identifiers
+            now: Current time (time.monotonic)
+        """
+        with self._lock:
+            for identifier in identifiers:
+                first, _ = self._pending.get(identifier, (now, now))
+                self._pending[identifier] = (first, now)
+
+    def schedule_ready(self, now):
+        """
+        Queue identifiers whose changes have settled.
+
+        Args:
+            now: Current time (time.monotonic)
+
+        Returns:
+            list: Identifiers queued or marked for re-run
+        """
+        with self._lock:
+            ready = [
+                identifier for identifier, (first, last) in self._pending.items()
+                if now - last >= self.debounce or now - first >= self.max_wait
+            ]
+            for identifier in ready:
+                first, _ = self._pending.pop(identifier)
+                self._enqueue(identifier, first, now)
+
+        return ready
+
+    def _enqueue(self, identifier, first_change, now):
+        """Queue an identifier unless it is already queued; caller holds the lock."""
+        if identifier in self._queued:
+            return
+        if identifier in self._running:
+            self._rerun.add(identifier)
+            return
+
+        priority = (identifier in self._analyzed, first_change)
+        self._queue.put((priority, next(self._sequence), identifier))
+        self._queued[identifier] = now
+
+    def _worker(self):
+        """Run queued analyses until stopped."""
+        while not self._stop.is_set():
+            try:
+                _, _, identifier = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            started = time.monotonic()
+            with self._lock:
+                wait = started - self._queued.pop(identifier)
+                self._running.add(identifier)
+                depth = self._queue.qsize()
+
+            print(f"[daemon] Analyzing {identifier} (waited {wait:.1f}s, {depth} queued)")
+            try:
+                output, error = self._run_in_pool(identifier)
+            except Exception as e:
+                # the worker process itself failed
+                output, error = '', str(e) or type(e).__name__
+            elapsed = time.monotonic() - started
+            ok = error is None
+
+            # one write per job keeps concurrent jobs' logs apart
+            print(''.join(f"[{identifier}] {line}\n" for line in output.splitlines()), end='')
+            if not ok:
+                print(f"[daemon] ✗ Analysis of {identifier} failed: {error}")
+
+            with self._lock:
+                self._running.discard(identifier)
+                self._analyzed.add(identifier)
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+                self._run_seconds.append(elapsed)
+                self._wait_seconds.append(wait)
+                self._last_job = {
+                    'identifier': identifier,
+                    'ok': ok,
+                    'run_seconds': elapsed,
+                    'wait_seconds': wait
+                }
+                if identifier in self._rerun:
+                    self._rerun.discard(identifier)
+                    now = time.monotonic()
+                    self._enqueue(identifier, now, now)
+
+            print(f"[daemon] {'✓' if ok else '✗'} {identifier} finished in {elapsed:.1f}s")
+            self._queue.task_done()
+
+    def _run_in_pool(self, identifier):
+        """
+        Run one job in the process pool.
+
+        A worker process that dies breaks the whole pool and fails every
+        job running in it, so the pool is replaced and the job retried once
+        before it is reported as failed.
+
+        Args:
+            identifier: Dataset identifier
+
+        Returns:
+            tuple: (captured output, error message or None)
+        """
+        for _ in range(2):
+            with self._lock:
+                pool = self._pool
+            try:
+                return pool.submit(_run_job, self.analyze, identifier, self.analysis_options).result()
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+
+        return '', 'worker process died'
+
+    def _new_pool(self):
+        """Create the process pool that runs analyses."""
+        # spawn rather than fork, since the daemon already runs threads
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_ignore_interrupts
+        )
+
+    def _replace_pool(self, broken):
+        """Swap a broken pool for a new one, once however many jobs saw it break."""
+        with self._lock:
+            if self._pool is broken:
+                print("[daemon] ✗ A worker process died; restarting the process pool")
+                self._pool = self._new_pool()
+        broken.shutdown(wait=False)
+
+    def stats(self):
+        """
+        Report queue depth and job latency counters.
+
+        Returns:
+            dict: Current daemon statistics
+        """
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'running': sorted(self._running),
+                'pending': sorted(self._pending),
+                'jobs_completed': self._completed,
+                'jobs_failed': self._failed,
+                'run_seconds': _summarize(self._run_seconds),
+                'wait_seconds': _summarize(self._wait_seconds),
+                'last_job': self._last_job
+            }
+
+    def start(self):
+        """Start the worker processes and the threads that feed them."""
+        self._pool = self._new_pool()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'analysis-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Ask the poll loop and workers to stop after current jobs."""
+        self._stop.set()
+
+    def join(self):
+        """Wait for workers to finish their current jobs, then shut down the pool."""
+        for thread in self._threads:
+            thread.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def run(self, interval=5.0, stats_path=STATS_PATH, analyze_existing=False):
+        """
+        Poll the data folder until stopped.
+
+        Analyses always read ./data/<identifier>, so that is the folder
+        watched.
+
+        Args:
+            interval: Seconds between scans
+            stats_path: File the statistics are written to after each scan
+                (None to disable)
+            analyze_existing: Analyze every identifier found at startup
+        """
+        self.start()
+
+        snapshot = scan_data_tree(DATA_DIR)
+        if analyze_existing:
+            # mark as settled so they are queued on the first scan
+            self.observe(changed_identifiers({}, snapshot), time.monotonic() - self.debounce)
+        print(f"[daemon] Watching {DATA_DIR} ({len(snapshot)} identifiers, {self.workers} workers)")
+
+        try:
+            while True:
+                now = time.monotonic()
+                current = scan_data_tree(DATA_DIR)
+                changed = changed_identifiers(snapshot, current)
+                snapshot = current
+
+                if changed:
+                    print(f"[daemon] Changes in: {', '.join(sorted(changed))}")
+                    self.observe(changed, now)
+                self.schedule_ready(now)
+
+                if stats_path:
+                    write_stats(self.stats(), stats_path)
+
+                if self._stop.wait(interval):
+                    break
+        finally:
+            self.stop()
+            self.join()
+            if stats_path:
+                write_stats(self.stats(), stats_path)
+
+
+def write_stats(stats, stats_path=STATS_PATH):
+    """
+    Write daemon statistics to a JSON file atomically.
+
+    Args:
+        stats: dict from WatchDaemon.stats
+        stats_path: Output path
+
+    Returns:
+        str: Path to the written file
+    """
+    os.makedirs(os.path.dirname(stats_path) or '.', exist_ok=True)
+
+    temp_path = f"{stats_path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(stats, f, indent=2)
+    os.replace(temp_path, stats_path)
+
+    return stats_path
+
+
+def main():
+    """Main entry point for the watch daemon."""
+    parser = argparse.ArgumentParser(
+        description='Re-analyze identifiers when new usage exports land in ./data/'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=2,
+        help='Number of concurrent analyses (default: 2)'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=5.0,
+        help='Seconds between scans of ./data/ (default: 5)'
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=30.0,
+        help='Seconds without new files before an identifier is analyzed (default: 30)'
+    )
+    parser.add_argument(
+        '--max-wait',
+        type=float,
+        default=300.0,
+        help='Analyze at most this many seconds after the first new file, even if files keep arriving (default: 300)'
+    )
+    parser.add_argument(
+        '--analyze-existing',
+        action='store_true',
+        help='Analyze every identifier already present at startup'
+    )
+    parser.add_argument(
+        '--chunked',
+        choices=CHUNK_MODES,
+        help='Process histories in bounded-size chunks (per file or per month)'
+    )
+    parser.add_argument(
+        '--impute',
+        action='store_true',
+        help='Fill missing hours with the median for the same hour of week'
+    )
+
+    args = parser.parse_args()
+
+    if args.chunked and args.impute:
+        parser.error('--impute needs the whole history at once and cannot be combined with --chunked')
+
+    daemon = WatchDaemon(
+        workers=args.workers,
+        debounce=args.debounce,
+        max_wait=args.max_wait,
+        analysis_options={'chunked': args.chunked, 'impute': args.impute}
+    )
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+
+    try:
+        daemon.run(interval=args.interval, analyze_existing=args.analyze_existing)
+    except KeyboardInterrupt:
+        # run() has already let the workers finish their current jobs
+        pass
+
+    stats = daemon.stats()
+    print(f"[daemon] Stopped after {stats['jobs_completed']} completed and {stats['jobs_failed']} failed jobs")
+
+
+if __name__ == '__main__':
+    main()